@@ -1,13 +1,22 @@
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urljoin, urlparse, unquote
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from helpers.fetch import conditional_headers, fetch, file_sha256, load_cache, make_session, save_cache, stream_to_file
 
 ARCHIVE_URL = "https://www.pa.gov/agencies/dos/resources/voting-and-elections-resources/voting-and-election-statistics#accordion-6cb6ca8a99-item-df8c67bfea"
 OUT_DIR = Path("data/historical")
+MANIFEST_PATH = OUT_DIR / "manifest.json"
+PAGE_PATH = OUT_DIR / "statistics_page.html"
+LINK_INDEX_PATH = OUT_DIR / "link_index.json"
+# The accordion item that holds the archive links; ARCHIVE_URL's fragment points at it.
+ACCORDION_ID_RE = re.compile(r"accordion-.*df8c67bfea$")
+MAX_WORKERS = 6
 
 PRIMARY_MONTH_BY_YEAR = {
     1999: "may", 2000: "april", 2001: "may", 2002: "may", 2003: "may",
@@ -89,63 +98,165 @@ def is_archive_pdf(a_tag) -> bool:
     looks_election = any(t in text.lower() for t in electionish_tokens) or any(t in url_basename.lower() for t in electionish_tokens)
     return looks_election
 
-def scrape_archive_links():
-    resp = requests.get(ARCHIVE_URL, timeout=60)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "lxml")
-
-    container = soup.select_one('[id*="accordion-"][id$="df8c67bfea"]') or soup
-
-    items = []
-    for a in container.find_all("a", href=True):
-        if not is_archive_pdf(a):
-            continue
-
-        href = a["href"]
-        url = href if href.startswith("http") else urljoin("https://www.pa.gov", href)
-        link_text = (a.get_text() or "").strip()
-        url_basename = unquote(os.path.basename(urlparse(url).path))
-
-        year = extract_year(link_text) or extract_year(url_basename)
-        month_word = infer_month_word(link_text, url_basename, year)
-
-        if not (year and month_word):
-            continue
-
-        items.append({
-            "url": url,
-            "year": year,
-            "month_word": month_word,
-            "name": normalized_filename(month_word, year),
-        })
+def parse_link(a):
+    if not is_archive_pdf(a):
+        return None
+
+    href = a["href"]
+    url = href if href.startswith("http") else urljoin("https://www.pa.gov", href)
+    link_text = (a.get_text() or "").strip()
+    url_basename = unquote(os.path.basename(urlparse(url).path))
+
+    year = extract_year(link_text) or extract_year(url_basename)
+    month_word = infer_month_word(link_text, url_basename, year)
+
+    if not (year and month_word):
+        return None
+
+    return {
+        "url": url,
+        "year": year,
+        "month_word": month_word,
+        "name": normalized_filename(month_word, year),
+    }
+
+def extract_links(html, targeted=True):
+    anchors = []
+    if targeted:
+        # Build only the accordion subtree and only look at anchors that point at PDFs.
+        soup = BeautifulSoup(html, "lxml", parse_only=SoupStrainer(id=ACCORDION_ID_RE))
+        anchors = soup.find_all("a", href=PDF_RE)
+    if not anchors:
+        # Whole-page parse: the benchmark baseline, and a fallback if the accordion moves.
+        soup = BeautifulSoup(html, "lxml")
+        container = soup.select_one('[id*="accordion-"][id$="df8c67bfea"]') or soup
+        anchors = container.find_all("a", href=True)
 
     dedup = {}
-    for it in items:
+    for a in anchors:
+        it = parse_link(a)
+        if it is None:
+            continue
         key = (to_mm(it["month_word"]), it["year"])
         if key not in dedup:
             dedup[key] = it
     return list(dedup.values())
 
-def download_archive_pdfs():
-    ensure_out_dir()
-    items = scrape_archive_links()
-    for it in items:
-        out_path = OUT_DIR / it["name"]
-        if out_path.exists():
-            i = 2
-            while True:
-                candidate = OUT_DIR / it["name"].replace(".pdf", f"-{i}.pdf")
-                if not candidate.exists():
-                    out_path = candidate
-                    break
-                i += 1
-
-        print(f"Downloading {it['name']}...")
-        r = requests.get(it["url"], timeout=120)
-        r.raise_for_status()
-        out_path.write_bytes(r.content)
+def scrape_archive_links():
+    with make_session(1) as session:
+        return discover_archive_links(session)[0]
 
-    print("Finished downloading archive PDFs.")
+def update_link_index(index, items, now):
+    links = index.setdefault("links", {})
+    fresh = []
+    for it in items:
+        key = manifest_key(it)
+        entry = links.get(key)
+        if entry is None or entry["url"] != it["url"]:
+            fresh.append(it)
+            previous = {"previous_url": entry["url"]} if entry else {}
+            links[key] = {**it, **previous, "first_seen": now}
+        links[key]["last_seen"] = now
+    index["current"] = sorted(manifest_key(it) for it in items)
+    return fresh
+
+def discover_archive_links(session, force=False, page_path=None, index_path=LINK_INDEX_PATH):
+    ensure_out_dir()
+    index = load_cache(index_path)
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    if page_path is not None:
+        html = Path(page_path).read_text(encoding="utf-8", errors="replace")
+        changed = True
+    else:
+        previous = index.get("page", {}).get("sha256")
+        result = fetch(session, ARCHIVE_URL, PAGE_PATH, index.get("page"), force)
+        index["page"] = {**result["entry"], "checked_at": now}
+        changed = force or result["sha256"] != previous or not index.get("links")
+        html = PAGE_PATH.read_text(encoding="utf-8", errors="replace") if changed else None
+
+    if changed:
+        items = extract_links(html)
+        fresh = update_link_index(index, items, now)
+        print(f"Archive page changed: {len(items)} links, {len(fresh)} new or changed")
+    else:
+        links = index.get("links", {})
+        items = [
+            {k: links[key][k] for k in ("url", "year", "month_word", "name")}
+            for key in index.get("current", [])
+        ]
+        for key in index.get("current", []):
+            links[key]["last_seen"] = now
+        fresh = []
+        print(f"Archive page unchanged: {len(items)} known links")
+
+    save_cache(index_path, index)
+    return items, fresh
+
+def manifest_key(it) -> str:
+    return f"{it['year']}-{to_mm(it['month_word'])}"
+
+def needs_sync(it, entry, revalidate=False) -> bool:
+    if not entry or entry.get("url") != it["url"]:
+        return True
+    out_path = OUT_DIR / it["name"]
+    if not out_path.exists() or out_path.stat().st_size != entry.get("size"):
+        return True
+    return revalidate
+
+def sync_item(session, it, entry):
+    out_path = OUT_DIR / it["name"]
+    headers = None
+    if entry and entry.get("url") == it["url"] and out_path.exists():
+        headers = conditional_headers(entry)
+    return stream_to_file(session, it["url"], out_path, headers=headers, resume=True)
+
+def download_archive_pdfs(max_workers=MAX_WORKERS, revalidate=False, force=False, page_path=None):
+    ensure_out_dir()
+    manifest = load_cache(MANIFEST_PATH)
+
+    downloaded = 0
+    transferred = 0
+    with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        items, fresh = discover_archive_links(session, force=force, page_path=page_path)
+        # On an unchanged page every link is already known, so this is a local check only.
+        pending = [it for it in items if needs_sync(it, manifest.get(manifest_key(it)), revalidate)]
+        print(f"Archive links: {len(items)}; new or changed: {len(fresh)}; to sync: {len(pending)}")
+
+        futures = {
+            pool.submit(sync_item, session, it, manifest.get(manifest_key(it))): it
+            for it in pending
+        }
+        for future in as_completed(futures):
+            it = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Failed {it['name']}: {e}")
+                continue
+
+            key = manifest_key(it)
+            if result["not_modified"]:
+                print(f"Not modified: {it['name']}")
+                manifest[key]["checked_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            else:
+                resumed = f" (resumed at {result['resumed_from']} bytes)" if result["resumed_from"] else ""
+                print(f"Downloaded {it['name']}{resumed}")
+                downloaded += 1
+                transferred += result["bytes"] - result["resumed_from"]
+                manifest[key] = {
+                    "url": it["url"],
+                    "name": it["name"],
+                    "size": result["bytes"],
+                    "sha256": result["sha256"],
+                    "etag": result["etag"],
+                    "last_modified": result["last_modified"],
+                    "checked_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                }
+            save_cache(MANIFEST_PATH, manifest)
+
+    print(f"Finished syncing archive PDFs: {downloaded} downloaded, {transferred:,} bytes transferred.")
+    return manifest
 
 def rename_existing_to_mm_yyyy():
     ensure_out_dir()
@@ -159,15 +270,38 @@ def rename_existing_to_mm_yyyy():
         if target == p:
             continue
         if target.exists():
+            # Identical bytes already live under the canonical name; drop the duplicate.
+            if file_sha256(target) == file_sha256(p):
+                print(f"Removing duplicate {p.name} (same content as {target.name})")
+                p.unlink()
+                continue
             i = 2
             while True:
                 candidate = OUT_DIR / target.name.replace(".pdf", f"-{i}.pdf")
                 if not candidate.exists():
                     target = candidate
                     break
+                if file_sha256(candidate) == file_sha256(p):
+                    target = None
+                    break
                 i += 1
+            if target is None:
+                print(f"Removing duplicate {p.name}")
+                p.unlink()
+                continue
         print(f"Renaming {p.name} -> {target.name}")
         p.rename(target)
 
 if __name__ == "__main__":
-    download_archive_pdfs()
+    import argparse
+    parser = argparse.ArgumentParser(description="Sync historical voter registration PDFs.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--revalidate", action="store_true", help="send conditional requests for files already in the manifest")
+    parser.add_argument("--extract", action="store_true", help="parse synced PDFs into the historical Parquet dataset")
+    parser.add_argument("--force", action="store_true", help="refetch and reparse the statistics page")
+    parser.add_argument("--page", help="read archive links from a saved copy of the statistics page")
+    args = parser.parse_args()
+    download_archive_pdfs(max_workers=args.workers, revalidate=args.revalidate, force=args.force, page_path=args.page)
+    if args.extract:
+        from helpers.historical import build_dataset
+        build_dataset()
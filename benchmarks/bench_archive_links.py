@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import archive
+from benchmarks.generators import write_statistics_page
+from benchmarks.run import serve_directory
+from helpers.fetch import make_session
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-page and targeted archive link discovery.")
+    parser.add_argument("--page", help="saved copy of the statistics page (default: a synthetic page)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        page = Path(args.page) if args.page else write_statistics_page(Path(tmp) / "statistics.html")
+        html = page.read_text(encoding="utf-8", errors="replace")
+        print(f"Page: {page.name} ({len(html) / 1e6:.2f} MB)")
+
+        full, full_items = best_of(lambda: archive.extract_links(html, targeted=False), args.repeat)
+        targeted, targeted_items = best_of(lambda: archive.extract_links(html), args.repeat)
+        assert full_items == targeted_items, "targeted parse found different links"
+        print(f"full-page parse:     {full * 1000:8.1f} ms ({len(full_items)} links)")
+        print(f"targeted parse:      {targeted * 1000:8.1f} ms ({full / targeted:.1f}x faster)")
+
+        # Incremental discovery against a local server: the first call parses, later ones get a 304.
+        server = serve_directory(page.parent)
+        cwd = os.getcwd()
+        try:
+            os.chdir(tmp)
+            archive.ARCHIVE_URL = f"http://127.0.0.1:{server.server_port}/{page.name}"
+            index_path = Path(tmp) / "link_index.json"
+            with make_session(1) as session:
+                first, (_, fresh) = best_of(lambda: archive.discover_archive_links(session, index_path=index_path), 1)
+                unchanged, (_, again) = best_of(lambda: archive.discover_archive_links(session, index_path=index_path), args.repeat)
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+        print(f"first discovery:     {first * 1000:8.1f} ms ({len(fresh)} new links)")
+        print(f"unchanged discovery: {unchanged * 1000:8.1f} ms ({len(again)} new links)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import boto3
+    from moto import mock_aws
+except ImportError:
+    sys.exit("bench_publish needs moto: pip install -r requirements-dev.txt")
+
+from helpers import upload_to_s3 as publisher
+
+def make_files(out_dir, count, size):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (out_dir / f"artifact_{i}.json").write_bytes(os.urandom(size))
+
+def timed_publish(processed_dir, workers):
+    start = time.perf_counter()
+    urls = publisher.upload_to_s3(processed_dir, max_workers=workers)
+    return time.perf_counter() - start, len(urls or [])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure S3 publish throughput against moto.")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--size", type=int, default=256 * 1024)
+    parser.add_argument("--workers", type=int, default=publisher.MAX_WORKERS)
+    args = parser.parse_args()
+
+    os.environ.update({
+        "S3_BUCKET_NAME": "bench-bucket",
+        "AWS_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+    })
+    os.environ.pop("S3_ENDPOINT_URL", None)
+
+    with mock_aws(), tempfile.TemporaryDirectory() as tmp:
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="bench-bucket")
+        processed_dir = Path(tmp) / "processed"
+        make_files(processed_dir, args.files, args.size)
+        total_mb = args.files * args.size / 1e6
+
+        cold, _ = timed_publish(processed_dir, args.workers)
+        warm, _ = timed_publish(processed_dir, args.workers)
+        serial, _ = timed_publish(processed_dir, 1)
+
+    print(f"\ncold publish:   {cold:.2f}s ({total_mb / cold:.1f} MB/s)")
+    print(f"warm publish:   {warm:.2f}s (all unchanged)")
+    print(f"warm, 1 worker: {serial:.2f}s")
+
+if __name__ == "__main__":
+    main()
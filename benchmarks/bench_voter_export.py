@@ -0,0 +1,34 @@
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.generators import write_voter_export
+from helpers import voter_export
+
+def main():
+    parser = argparse.ArgumentParser(description="Check voter-export aggregation memory stays flat as input grows.")
+    parser.add_argument("--rows", type=int, action="append", help="repeatable; default 100k, 400k, 1.6M")
+    parser.add_argument("--chunk-rows", type=int, default=voter_export.CHUNK_ROWS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows or [100_000, 400_000, 1_600_000]:
+            path = write_voter_export(Path(tmp) / f"CENTRE FVE {rows}.txt", rows)
+            tracemalloc.start()
+            start = time.perf_counter()
+            # Single process so the parent sees every allocation.
+            voter_export.aggregate([path], max_workers=0, chunk_rows=args.chunk_rows)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            size_mb = path.stat().st_size / 1e6
+            print(f"{rows:>10,} rows ({size_mb:7.1f} MB): {seconds:6.2f}s, peak {peak / 1e6:6.1f} MB")
+            path.unlink()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import reportlab  # noqa: F401
+except ImportError:
+    sys.exit("check_historical needs reportlab: pip install -r requirements-dev.txt")
+
+from benchmarks.generators import write_registration_pdf
+from helpers import historical
+from helpers.geography import PA_COUNTIES
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f"FAIL: {message}")
+    print(f"ok: {message}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract generated sample PDFs and check the historical dataset.")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        pdf_dir = tmp / "pdfs"
+        pdf_dir.mkdir()
+        expected = {
+            "2024-11": write_registration_pdf(pdf_dir / "11-2024.pdf", seed=1),
+            "2004-04": write_registration_pdf(pdf_dir / "04-2004.pdf", no_affiliation=False, seed=2),
+        }
+        write_registration_pdf(pdf_dir / "05-2019.pdf", counties=PA_COUNTIES[:40], seed=3)
+        paths = {
+            "pdf_dir": pdf_dir,
+            "dataset_dir": tmp / "dataset",
+            "cache_dir": tmp / "extracted",
+            "index_path": tmp / "index.json",
+        }
+
+        start = time.perf_counter()
+        index = historical.build_dataset(max_workers=args.workers, **paths)
+        print(f"extracted {len(index)} PDFs in {time.perf_counter() - start:.2f}s")
+
+        check(sorted(index) == sorted(expected), "partial PDF is rejected and not indexed")
+        check(not (paths["dataset_dir"] / "election_date=2019-05").exists(), "partial PDF writes no partition")
+        history = historical.load_history(paths["dataset_dir"])
+        for key, counts in expected.items():
+            rows = history[history["election_date"] == key].set_index("CountyName")
+            got = {name: tuple(int(v) for v in rows.loc[name, ["Democrat", "Republican", "No Affiliation", "Other", "Total"]])
+                   for name in rows.index}
+            check(got == counts, f"{key}: all {len(counts)} counties round-trip exactly")
+        check(all(entry["parser_version"] == historical.PARSER_VERSION for entry in index.values()),
+              "index records the parser version")
+
+        check(historical.build_dataset(max_workers=args.workers, **paths) == index, "second run re-extracts nothing")
+        historical.PARSER_VERSION += 1
+        reparsed = historical.build_dataset(max_workers=args.workers, **paths)
+        check(all(entry["parser_version"] == historical.PARSER_VERSION for entry in reparsed.values()),
+              "a parser version bump re-extracts every PDF")
+
+if __name__ == "__main__":
+    main()
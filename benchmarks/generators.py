@@ -0,0 +1,148 @@
+import random
+from pathlib import Path
+
+import openpyxl
+
+from helpers.geography import PA_COUNTIES
+
+DISTRICT_PARTIES = ['Democratic', 'Republican', 'Libertarian', 'Green', 'No Affiliation', 'Other']
+
+# Today's DOS releases: 67 counties, 17 congressional, 50 senate and 203 house districts.
+SCALES = {
+    "today": {"counties": 67, "congress": 17, "senate": 50, "house": 203, "rows_per_district": None},
+    "10x": {"counties": 670, "congress": 170, "senate": 500, "house": 2030, "rows_per_district": None},
+    "precinct": {"counties": 9200, "congress": 17, "senate": 50, "house": 203, "rows_per_district": 45},
+}
+
+def county_names(n):
+    names = [c.upper() for c in PA_COUNTIES]
+    return [names[i] if i < len(names) else f"SYNTHETIC {i}" for i in range(n)]
+
+def fmt(n, rng):
+    # DOS mixes numeric cells with comma-formatted text cells.
+    return f"{n:,}" if rng.random() < 0.5 else n
+
+def write_county_workbook(path, counties=67, seed=0, as_of="10/14/2026"):
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([f"Voter Registration Statistics as of {as_of}"])
+    ws.append(["CountyName", "CountyID", "Dem", "Rep", "No Aff", "Other", "Total Count of All Voters", None])
+    totals = [0] * 5
+    for i, name in enumerate(county_names(counties)):
+        parts = [rng.randint(1_000, 600_000), rng.randint(1_000, 400_000), rng.randint(500, 150_000), rng.randint(100, 90_000)]
+        row = parts + [sum(parts)]
+        totals = [a + b for a, b in zip(totals, row)]
+        ws.append([name, i + 1] + [fmt(v, rng) for v in row] + [None])
+    ws.append(["Total", None] + [f"{v:,}" for v in totals])
+    wb.save(path)
+    return Path(path)
+
+def write_district_workbook(path, districts, counties=67, rows_per_district=None, seed=0):
+    rng = random.Random(seed)
+    names = county_names(counties)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["DistrictCode", "CountyName"] + DISTRICT_PARTIES + ["Total"])
+    for district in range(1, districts + 1):
+        n_rows = rows_per_district or rng.randint(1, 4)
+        subtotal = [0] * len(DISTRICT_PARTIES)
+        for j in range(n_rows):
+            parts = [rng.randint(0, 40_000) for _ in DISTRICT_PARTIES]
+            subtotal = [a + b for a, b in zip(subtotal, parts)]
+            # DistrictCode is only filled on a district's first row; the helpers ffill it.
+            code = district if j == 0 else None
+            ws.append([code, rng.choice(names)] + parts + [sum(parts)])
+        ws.append([None, "Sub Total"] + subtotal + [sum(subtotal)])
+    wb.save(path)
+    return Path(path)
+
+def write_source_set(out_dir, scale="today", seed=0):
+    spec = SCALES[scale]
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = {"current_voter_stats.xls": write_county_workbook(out_dir / "current_voter_stats.xls", spec["counties"], seed)}
+    for i, chamber in enumerate(("congress", "senate", "house")):
+        files[f"{chamber}.xlsx"] = write_district_workbook(
+            out_dir / f"{chamber}.xlsx",
+            spec[chamber],
+            counties=spec["counties"],
+            rows_per_district=spec["rows_per_district"],
+            seed=seed + i + 1,
+        )
+    return files
+
+FVE_FIELDS = 150
+FVE_PARTY_WEIGHTS = (("D", 44), ("R", 40), ("NF", 9), ("LN", 1), ("GR", 1), ("OTH", 5))
+
+def write_voter_export(path, rows, county="Centre", seed=0, batch=50_000):
+    rng = random.Random(seed)
+    codes = [c for c, _ in FVE_PARTY_WEIGHTS]
+    weights = [w for _, w in FVE_PARTY_WEIGHTS]
+    blank = [""] * FVE_FIELDS
+    path = Path(path) / f"{county.upper()} FVE 20261014.txt" if Path(path).is_dir() else Path(path)
+    with open(path, "w", encoding="latin-1") as f:
+        for start in range(0, rows, batch):
+            lines = []
+            for i in range(start, min(rows, start + batch)):
+                row = list(blank)
+                row[0] = f"{i:012d}"
+                row[2] = "SYNTHETIC"
+                row[9] = "A"
+                row[11] = rng.choices(codes, weights)[0]
+                row[30] = f"CG{rng.randint(1, 17):02d}"
+                row[31] = f"STS{rng.randint(1, 50):02d}"
+                row[32] = f"STH{rng.randint(1, 203):03d}"
+                lines.append("\t".join(f'"{v}"' for v in row))
+            f.write("\n".join(lines) + "\n")
+    return path
+
+def write_statistics_page(path, first_year=1999, last_year=2025, filler_sections=40, links_per_section=60, seed=0):
+    # Shaped like the DOS statistics page: a large page of navigation and other
+    # accordions, with the archive PDFs in one accordion item.
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Voting and Election Statistics</title></head><body><nav>"]
+    parts += [f'<a href="/agencies/dos/page-{i}.html">Page {i}</a>' for i in range(400)]
+    parts.append("</nav><main>")
+    for s in range(filler_sections):
+        parts.append(f'<div class="cmp-accordion" id="accordion-{s:010x}-item-{rng.getrandbits(40):010x}"><ul>')
+        for i in range(links_per_section):
+            year = rng.randint(first_year, last_year)
+            parts.append(f'<li><a href="/content/dam/dos/{s}/report-{i}-{year}.pdf">Report {i} ({year})</a> '
+                         f'<span>{"lorem ipsum " * 8}</span></li>')
+        parts.append("</ul></div>")
+    parts.append('<div class="cmp-accordion" id="accordion-6cb6ca8a99-item-df8c67bfea"><ul>')
+    for year in range(last_year, first_year - 1, -1):
+        for label, stem in (("General", "ElectionNov"), ("Primary", "Primary")):
+            parts.append(f'<li><a href="/content/dam/copapwp-pagov/en/dos/{year}-{stem}-VR-Stats.pdf">'
+                         f'{year} {label} Election Voter Registration Statistics</a></li>')
+    parts.append("</ul></div></main></body></html>")
+    Path(path).write_text("\n".join(parts), encoding="utf-8")
+    return Path(path)
+
+def write_registration_pdf(path, counties=None, no_affiliation=True, seed=0):
+    # A DOS-style historical report: a title, a header row and one text line per county.
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    counties = PA_COUNTIES if counties is None else counties
+    expected = {}
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    y = 750
+    pdf.drawString(40, y, "Voter Registration Statistics by County")
+    y -= 20
+    pdf.drawString(40, y, "County Democratic Republican " + ("No Affiliation " if no_affiliation else "") + "Other Total")
+    for name in counties:
+        y -= 14
+        if y < 40:
+            pdf.showPage()
+            y = 750
+        dem, rep, other = rng.randint(1_000, 400_000), rng.randint(1_000, 400_000), rng.randint(0, 50_000)
+        no_aff = rng.randint(0, 80_000) if no_affiliation else 0
+        total = dem + rep + no_aff + other
+        numbers = [dem, rep, *([no_aff] if no_affiliation else []), other, total]
+        pdf.drawString(40, y, f"{name.upper()} " + " ".join(f"{n:,}" for n in numbers))
+        expected[name] = (dem, rep, no_aff, other, total)
+    pdf.save()
+    return expected
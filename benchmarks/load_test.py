@@ -0,0 +1,87 @@
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_PATHS = [
+    "/api/county",
+    "/api/county?county=Centre&party=Democrat,Republican",
+    "/api/total",
+    "/api/house?district=77",
+    "/api/senate?district=16&party=Republican",
+    "/api/congress",
+    "/metadata",
+]
+
+def worker(base, paths, requests, revalidate, latencies, errors):
+    url = urlparse(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+    etags = {}
+    for i in range(requests):
+        path = paths[i % len(paths)]
+        headers = {"Accept-Encoding": "gzip"}
+        if revalidate and path in etags:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+        except Exception:
+            errors.append(path)
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if resp.status == 200 and resp.getheader("ETag"):
+            etags[path] = resp.getheader("ETag")
+    conn.close()
+
+def run(base, paths, concurrency, requests, revalidate):
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(base, paths, requests, revalidate, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    label = "revalidating (304)" if revalidate else "full responses"
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    print(f"{label:<20} {len(latencies) / elapsed:8.0f} req/s  "
+          f"p50 {statistics.median(latencies) * 1000:.2f} ms  p99 {p99 * 1000:.2f} ms  errors {len(errors)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the processed-data read API.")
+    parser.add_argument("--url", help="running server base URL; omit to start one on data/processed")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="requests per client")
+    args = parser.parse_args()
+
+    server = None
+    base = args.url
+    if not base:
+        import serve
+        server = serve.make_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        run(base, DEFAULT_PATHS, args.concurrency, args.requests, revalidate=False)
+        run(base, DEFAULT_PATHS, args.concurrency, args.requests, revalidate=True)
+    finally:
+        if server:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
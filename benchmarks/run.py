@@ -0,0 +1,128 @@
+import argparse
+import functools
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.generators import SCALES, write_source_set
+from helpers import congress, county, house, senate, total
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+def measure(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            fn()
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        if best is None or seconds < best["seconds"]:
+            best = {"seconds": round(seconds, 5), "peak_bytes": peak}
+    return best
+
+def serve_directory(directory):
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def bench_end_to_end(src_dir, repeat, parse_workers=None):
+    import scraper
+
+    server = serve_directory(src_dir)
+    base = f"http://127.0.0.1:{server.server_port}/"
+    files = {name: base + name for name in scraper.FILES_TO_DOWNLOAD}
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            return measure(lambda: scraper.download_files(force=True, files=files, parse_workers=parse_workers), repeat)
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+
+def bench_scale(scale, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        src = write_source_set(Path(tmp) / "src", scale)
+        county_artifact = county.process_file(src["current_voter_stats.xls"])
+        results = {
+            "county": measure(lambda: county.process_file(src["current_voter_stats.xls"]), repeat),
+            "total": measure(lambda: total.process_file(county_artifact), repeat),
+            "congress": measure(lambda: congress.process_file(src["congress.xlsx"]), repeat),
+            "senate": measure(lambda: senate.process_file(src["senate.xlsx"]), repeat),
+            "house": measure(lambda: house.process_file(src["house.xlsx"]), repeat),
+            "download_files": bench_end_to_end(src["current_voter_stats.xls"].parent, repeat),
+            "download_files_1proc": bench_end_to_end(src["current_voter_stats.xls"].parent, repeat, parse_workers=0),
+        }
+        results["source_bytes"] = {name: p.stat().st_size for name, p in src.items()}
+    return results
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def compare(current, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nCompared with {baseline['revision']}:")
+    for scale, stages in current["scales"].items():
+        for stage, now in stages.items():
+            before = baseline["scales"].get(scale, {}).get(stage)
+            if not before or "seconds" not in now:
+                continue
+            ratio = now["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+            flag = "  <-- slower" if ratio > 1.1 else ""
+            print(f"  {scale:>8} {stage:<20} {before['seconds']:.4f}s -> {now['seconds']:.4f}s ({ratio:.2f}x){flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process_file and download_files on synthetic DOS workbooks.")
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES), help="repeatable; defaults to all scales")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="results file (default benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "revision": git_revision(),
+        "created_at_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": sys.version.split()[0],
+        "scales": {},
+    }
+    for scale in args.scale or list(SCALES):
+        report["scales"][scale] = bench_scale(scale, args.repeat)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{report['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print()
+    for scale, stages in report["scales"].items():
+        for stage, result in stages.items():
+            if "seconds" in result:
+                print(f"{scale:>8} {stage:<20} {result['seconds']:.4f}s  peak {result['peak_bytes'] / 1e6:.1f} MB")
+    print(f"\nResults saved -> {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from helpers.formats import default_formats, write_formats
+
+@dataclass
+class Artifact:
+    name: str
+    file_name: str
+    frame: pd.DataFrame
+    metadata: dict = field(default_factory=dict)
+    files: dict = field(default_factory=dict)
+    breakdown: pd.DataFrame | None = None
+
+def load_metadata(output_dir):
+    metadata_path = Path(output_dir) / "metadata.json"
+    if not metadata_path.exists():
+        return {}
+    try:
+        return json.loads(metadata_path.read_text())
+    except Exception:
+        return {}
+
+def build_metadata(artifacts, existing=None):
+    existing = existing or {}
+    entries = dict(existing.get("artifacts", {}))
+    for artifact in artifacts:
+        files = artifact.files or {"xlsx": artifact.file_name}
+        file_name = files.get("xlsx", next(iter(files.values())))
+        entries[artifact.name] = {"file_name": file_name, **artifact.metadata, "formats": files}
+
+    county = entries.get("county", {})
+    return {
+        "last_updated": county.get("source_date", existing.get("last_updated", "Unknown")),
+        "generated_at_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "file_name": county.get("file_name", "county.xlsx"),
+        "total_counties": int(county.get("total_counties", 0)),
+        "artifacts": dict(sorted(entries.items())),
+    }
+
+def write_artifact_files(artifacts, output_dir, formats=None):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    formats = formats or {}
+
+    for artifact in artifacts:
+        selected = formats.get(artifact.name, formats.get("all", default_formats(artifact.name)))
+        artifact.files = write_formats(artifact, output_dir, selected)
+        print(f"Wrote {artifact.name} -> {', '.join(artifact.files.values())}")
+    return artifacts
+
+def write_metadata(artifacts, output_dir):
+    output_dir = Path(output_dir)
+    # Artifacts skipped this run keep their previous metadata entries.
+    metadata = build_metadata(artifacts, load_metadata(output_dir))
+    metadata_path = output_dir / "metadata.json"
+    metadata_path.write_text(json.dumps(metadata, indent=2))
+    print(f"Updated consolidated metadata -> {metadata_path}")
+
+    old_totals_meta = output_dir / "total_metadata.json"
+    if old_totals_meta.exists():
+        old_totals_meta.unlink()
+        print("Removed legacy file -> total_metadata.json")
+
+    return metadata
+
+def write_artifacts(artifacts, output_dir, formats=None):
+    write_artifact_files(artifacts, output_dir, formats)
+    return write_metadata(artifacts, output_dir)
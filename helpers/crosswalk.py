@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CROSSWALK_DIR = Path("data/crosswalk")
+
+class Crosswalk:
+    # A sparse county x district matrix of party counts stored as coordinate arrays.
+    def __init__(self, chamber, counties, districts, county_idx, district_idx, counts, parties):
+        self.chamber = chamber
+        self.counties = np.asarray(counties, dtype=str)
+        self.districts = np.asarray(districts, dtype=np.int32)
+        self.county_idx = np.asarray(county_idx, dtype=np.int32)
+        self.district_idx = np.asarray(district_idx, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.uint32)
+        self.parties = [str(p) for p in parties]
+
+        self._county_pos = {name: i for i, name in enumerate(self.counties)}
+        self._district_pos = {int(code): i for i, code in enumerate(self.districts)}
+        self._pair = {(int(c), int(d)): i for i, (c, d) in enumerate(zip(self.county_idx, self.district_idx))}
+        order = np.argsort(self.county_idx, kind="stable")
+        bounds = np.searchsorted(self.county_idx[order], np.arange(len(self.counties) + 1))
+        self._rows_by_county = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.counties))]
+        order = np.argsort(self.district_idx, kind="stable")
+        bounds = np.searchsorted(self.district_idx[order], np.arange(len(self.districts) + 1))
+        self._rows_by_district = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.districts))]
+
+    @classmethod
+    def from_breakdown(cls, chamber, breakdown):
+        parties = [c for c in breakdown.columns if c not in ('DistrictCode', 'CountyName')]
+        grouped = breakdown.groupby(['CountyName', 'DistrictCode'], sort=True, observed=True)[parties].sum().reset_index()
+        counties, county_idx = np.unique(grouped['CountyName'].to_numpy(dtype=str), return_inverse=True)
+        districts, district_idx = np.unique(grouped['DistrictCode'].to_numpy(dtype=np.int32), return_inverse=True)
+        return cls(chamber, counties, districts, county_idx, district_idx, grouped[parties].to_numpy(), parties)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                str(data["chamber"]), data["counties"], data["districts"],
+                data["county_idx"], data["district_idx"], data["counts"], data["parties"],
+            )
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            chamber=np.asarray(self.chamber),
+            counties=self.counties,
+            districts=self.districts,
+            county_idx=self.county_idx,
+            district_idx=self.district_idx,
+            counts=self.counts,
+            parties=np.asarray(self.parties),
+        )
+        return path
+
+    def _frame(self, rows, key_column, keys):
+        df = pd.DataFrame(self.counts[rows].astype(np.int64), columns=self.parties)
+        df.insert(0, key_column, keys)
+        return df
+
+    def lookup(self, county, district):
+        row = self._pair.get((self._county_pos.get(county, -1), self._district_pos.get(int(district), -1)))
+        if row is None:
+            return None
+        return dict(zip(self.parties, self.counts[row].tolist()))
+
+    def by_county(self, county):
+        pos = self._county_pos.get(county)
+        rows = self._rows_by_county[pos] if pos is not None else np.array([], dtype=np.int64)
+        return self._frame(rows, 'DistrictCode', self.districts[self.district_idx[rows]])
+
+    def by_district(self, district):
+        pos = self._district_pos.get(int(district))
+        rows = self._rows_by_district[pos] if pos is not None else np.array([], dtype=np.int64)
+        return self._frame(rows, 'CountyName', self.counties[self.county_idx[rows]])
+
+    def _rollup(self, idx, size):
+        totals = np.zeros((size, len(self.parties)), dtype=np.int64)
+        np.add.at(totals, idx, self.counts)
+        return totals
+
+    def county_totals(self):
+        return pd.concat([
+            pd.DataFrame({'CountyName': self.counties}),
+            pd.DataFrame(self._rollup(self.county_idx, len(self.counties)), columns=self.parties),
+        ], axis=1)
+
+    def district_totals(self):
+        return pd.concat([
+            pd.DataFrame({'DistrictCode': self.districts}),
+            pd.DataFrame(self._rollup(self.district_idx, len(self.districts)), columns=self.parties),
+        ], axis=1)
+
+def build_crosswalks(artifacts, out_dir=CROSSWALK_DIR):
+    paths = []
+    for artifact in artifacts:
+        if artifact.breakdown is None or artifact.breakdown.empty:
+            continue
+        crosswalk = Crosswalk.from_breakdown(artifact.name, artifact.breakdown)
+        path = crosswalk.save(Path(out_dir) / f"{artifact.name}.npz")
+        print(f"Crosswalk {artifact.name}: {len(crosswalk.counts)} county-district pairs -> {path}")
+        paths.append(path)
+    return paths
+
+def load_crosswalk(chamber, crosswalk_dir=CROSSWALK_DIR):
+    return Crosswalk.load(Path(crosswalk_dir) / f"{chamber}.npz")
@@ -0,0 +1,42 @@
+from helpers.artifacts import Artifact
+from helpers.geography import COUNTY_BY_KEY, county_key
+from helpers.schema import SCHEMAS, parse
+from helpers.workbook import read_table
+
+NUMERIC_COLUMNS = ['Democratic', 'Republican', 'Libertarian', 'Green', 'No Affiliation', 'Other', 'Total']
+
+def is_subtotal(county_name):
+    return 'sub total' in str(county_name).lower()
+
+def county_breakdown(df):
+    names = df['CountyName'].astype(str)
+    df = df[df['CountyName'].notna() & ~names.str.contains('total', case=False)].copy()
+    df['CountyName'] = [COUNTY_BY_KEY.get(county_key(n), str(n).title()) for n in df['CountyName']]
+    df = parse(df, SCHEMAS['district_breakdown'])
+    df = df.sort_values(['DistrictCode', 'CountyName']).reset_index(drop=True)
+    column_order = ['DistrictCode', 'CountyName', *NUMERIC_COLUMNS]
+    return df[[col for col in column_order if col in df.columns]]
+
+def process_file(file_path, chamber):
+    # Keep every row: Sub Total rows become the district table, the rest the county-within-district breakdown.
+    table = read_table(file_path, header_row=0, fill_down=('DistrictCode',))
+    subtotal_mask = table.frame['CountyName'].map(is_subtotal)
+    df = table.frame[subtotal_mask]
+    breakdown = county_breakdown(table.frame[~subtotal_mask])
+
+    df = df.drop(columns=['CountyName'])
+
+    df = parse(df, SCHEMAS[chamber])
+
+    df = df.sort_values('DistrictCode').reset_index(drop=True)
+
+    column_order = ['DistrictCode', *NUMERIC_COLUMNS]
+    df = df[[col for col in column_order if col in df.columns]]
+
+    print(f"Processed {file_path}: {len(df)} districts, {len(breakdown)} county-district rows")
+    print(f"Headers: {list(df.columns)}")
+
+    return Artifact(chamber, f"{chamber}.xlsx", df, {
+        "districts": int(len(df)),
+        "rows_in_source": table.rows_read,
+    }, breakdown=breakdown)
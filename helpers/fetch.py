@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = (10, 120)
+
+def make_session(pool_size=8):
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_cache(cache_path):
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        return {}
+    try:
+        return json.loads(cache_path.read_text())
+    except Exception:
+        return {}
+
+def save_cache(cache_path, cache):
+    cache_path = Path(cache_path)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    os.replace(tmp_path, cache_path)
+
+def conditional_headers(entry):
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def read_part_meta(meta_path):
+    try:
+        return json.loads(Path(meta_path).read_text())
+    except Exception:
+        return {}
+
+def stream_to_file(session, url, path, headers=None, resume=False):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".part")
+    meta_path = path.with_name(path.name + ".part.json")
+    headers = dict(headers or {})
+    digest = hashlib.sha256()
+    size = 0
+
+    offset = tmp_path.stat().st_size if resume and tmp_path.exists() else 0
+    if offset:
+        part_meta = read_part_meta(meta_path)
+        validator = part_meta.get("etag") or part_meta.get("last_modified")
+        if validator:
+            # If-Range makes the server send the whole body if the file changed underneath us.
+            headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+        else:
+            offset = 0
+
+    with session.get(url, stream=True, timeout=TIMEOUT, headers=headers) as resp:
+        if resp.status_code == 304:
+            return {
+                "path": path,
+                "not_modified": True,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
+        resp.raise_for_status()
+
+        mode = "wb"
+        if offset and resp.status_code == 206:
+            mode = "ab"
+            with open(tmp_path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    size += len(chunk)
+        elif resume:
+            meta_path.write_text(json.dumps({
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }))
+
+        with open(tmp_path, mode) as f:
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+    os.replace(tmp_path, path)
+    if meta_path.exists():
+        meta_path.unlink()
+    return {
+        "path": path,
+        "not_modified": False,
+        "sha256": digest.hexdigest(),
+        "bytes": size,
+        "resumed_from": offset if mode == "ab" else 0,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+
+def fetch(session, url, path, entry=None, force=False):
+    entry = dict(entry or {})
+    path = Path(path)
+    headers = None
+    if not force and path.exists() and entry.get("sha256"):
+        headers = conditional_headers(entry)
+
+    result = stream_to_file(session, url, path, headers=headers)
+    if result["not_modified"]:
+        result["sha256"] = entry["sha256"]
+        result["bytes"] = 0
+
+    entry["sha256"] = result["sha256"]
+    entry["etag"] = result["etag"] or entry.get("etag")
+    entry["last_modified"] = result["last_modified"] or entry.get("last_modified")
+    entry.pop("processed_sha256", None)
+    result["entry"] = entry
+    return result
@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+def write_xlsx(frame, path):
+    frame.to_excel(path, index=False)
+
+def write_csv(frame, path):
+    frame.to_csv(path, index=False)
+
+def write_records_json(frame, path):
+    frame.to_json(path, orient="records")
+
+def write_columns_json(frame, path):
+    columns = json.loads(frame.to_json(orient="split", index=False))
+    data = {col: [row[i] for row in columns["data"]] for i, col in enumerate(columns["columns"])}
+    Path(path).write_text(json.dumps(data, separators=(",", ":")))
+
+def write_parquet(frame, path):
+    frame.to_parquet(path, index=False)
+
+FORMATS = {
+    "xlsx": (".xlsx", write_xlsx),
+    "csv": (".csv", write_csv),
+    "json": (".json", write_records_json),
+    "columns": (".columns.json", write_columns_json),
+    "parquet": (".parquet", write_parquet),
+}
+
+DEFAULT_FORMATS = ("xlsx", "csv", "json", "columns", "parquet")
+SMALL_FORMATS = ("json", "csv")
+
+VIEW_FORMATS = ("json", "columns", "parquet")
+
+def default_formats(name):
+    # Derived change tables are small and only read by the web front end.
+    if name.startswith("changes_"):
+        return SMALL_FORMATS
+    # Views are read by key from the web front end and the read API, never opened in Excel.
+    if name.startswith("view_"):
+        return VIEW_FORMATS
+    return DEFAULT_FORMATS
+
+def parse_format_specs(specs):
+    selected = {}
+    for spec in specs or []:
+        name, _, formats = spec.partition("=")
+        if not formats:
+            raise ValueError(f"Expected ARTIFACT=FORMAT[,FORMAT...], got {spec!r}")
+        names = tuple(f.strip() for f in formats.split(",") if f.strip())
+        unknown = [f for f in names if f not in FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown output format(s) {unknown}; choose from {sorted(FORMATS)}")
+        selected[name.strip()] = names
+    return selected
+
+def write_formats(artifact, output_dir, formats=DEFAULT_FORMATS):
+    stem = Path(artifact.file_name).stem
+    files = {}
+    for fmt in formats:
+        suffix, writer = FORMATS[fmt]
+        output_path = Path(output_dir) / f"{stem}{suffix}"
+        writer(artifact.frame, output_path)
+        files[fmt] = output_path.name
+    return files
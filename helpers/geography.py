@@ -0,0 +1,17 @@
+PA_COUNTIES = [
+    "Adams", "Allegheny", "Armstrong", "Beaver", "Bedford", "Berks", "Blair", "Bradford",
+    "Bucks", "Butler", "Cambria", "Cameron", "Carbon", "Centre", "Chester", "Clarion",
+    "Clearfield", "Clinton", "Columbia", "Crawford", "Cumberland", "Dauphin", "Delaware", "Elk",
+    "Erie", "Fayette", "Forest", "Franklin", "Fulton", "Greene", "Huntingdon", "Indiana",
+    "Jefferson", "Juniata", "Lackawanna", "Lancaster", "Lawrence", "Lebanon", "Lehigh", "Luzerne",
+    "Lycoming", "Mckean", "Mercer", "Mifflin", "Monroe", "Montgomery", "Montour", "Northampton",
+    "Northumberland", "Perry", "Philadelphia", "Pike", "Potter", "Schuylkill", "Snyder", "Somerset",
+    "Sullivan", "Susquehanna", "Tioga", "Union", "Venango", "Warren", "Washington", "Wayne",
+    "Westmoreland", "Wyoming", "York",
+]
+
+def county_key(name):
+    return "".join(ch for ch in str(name).upper() if ch.isalpha())
+
+COUNTY_BY_KEY = {county_key(name): name for name in PA_COUNTIES}
+COUNTY_ID = {name: i + 1 for i, name in enumerate(PA_COUNTIES)}
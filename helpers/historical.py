@@ -0,0 +1,153 @@
+import argparse
+import json
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from helpers.county import add_share_columns
+from helpers.fetch import file_sha256
+from helpers.geography import COUNTY_BY_KEY, COUNTY_ID, PA_COUNTIES, county_key
+
+HISTORICAL_DIR = Path("data/historical")
+DATASET_DIR = HISTORICAL_DIR / "dataset"
+CACHE_DIR = HISTORICAL_DIR / "extracted"
+INDEX_PATH = HISTORICAL_DIR / "dataset_index.json"
+# Bump when parse_text changes so every PDF is extracted again.
+PARSER_VERSION = 2
+
+PDF_NAME_RE = re.compile(r"^(\d{2})-(\d{4})\.pdf$")
+LINE_RE = re.compile(r"^\s*([A-Za-z][A-Za-z .'-]*?)\s+((?:\d[\d,]*\s*){3,})$")
+COLUMNS = ['CountyName', 'CountyID', 'Democrat', 'Republican', 'No Affiliation', 'Other', 'Total']
+
+def election_date(pdf_path):
+    m = PDF_NAME_RE.match(Path(pdf_path).name)
+    return f"{m.group(2)}-{m.group(1)}" if m else None
+
+def parse_counts(numbers):
+    # Older reports have no separate No Affiliation column; it is folded into Other there.
+    dem, rep, total = numbers[0], numbers[1], numbers[-1]
+    if len(numbers) >= 5:
+        no_aff, other = numbers[2], sum(numbers[3:-1])
+    else:
+        no_aff, other = 0, sum(numbers[2:-1])
+    if dem + rep + no_aff + other != total:
+        return None
+    return dem, rep, no_aff, other, total
+
+def parse_text(text):
+    rows = {}
+    for line in text.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        name = COUNTY_BY_KEY.get(county_key(m.group(1)))
+        if not name or name in rows:
+            continue
+        numbers = [int(tok.replace(",", "")) for tok in m.group(2).split()]
+        counts = parse_counts(numbers)
+        if counts:
+            rows[name] = [name, COUNTY_ID[name], *counts]
+
+    df = pd.DataFrame(sorted(rows.values(), key=lambda r: r[1]), columns=COLUMNS)
+    return add_share_columns(df)
+
+def extract_pdf(pdf_path):
+    from pypdf import PdfReader
+    reader = PdfReader(str(pdf_path))
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    df = parse_text(text)
+    # A partial table is a parser or layout problem, not data; never cache or publish it.
+    if len(df) < len(PA_COUNTIES):
+        missing = sorted(set(PA_COUNTIES) - set(df['CountyName']))
+        raise ValueError(f"matched {len(df)} of {len(PA_COUNTIES)} counties; missing {missing[:5]}")
+    return df
+
+def extract_cached(pdf_path, sha256, cache_dir=CACHE_DIR):
+    cache_path = Path(cache_dir) / f"{sha256}-v{PARSER_VERSION}.parquet"
+    if cache_path.exists():
+        return cache_path, False
+    df = extract_pdf(pdf_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    tmp_path.replace(cache_path)
+    return cache_path, True
+
+def load_index(index_path=INDEX_PATH):
+    index_path = Path(index_path)
+    if not index_path.exists():
+        return {}
+    return json.loads(index_path.read_text())
+
+def build_dataset(pdf_dir=HISTORICAL_DIR, dataset_dir=DATASET_DIR, cache_dir=CACHE_DIR,
+                  index_path=INDEX_PATH, max_workers=None):
+    start = time.perf_counter()
+    dataset_dir = Path(dataset_dir)
+    index = load_index(index_path)
+
+    sources = {}
+    for pdf_path in sorted(Path(pdf_dir).glob("*.pdf")):
+        key = election_date(pdf_path)
+        if key:
+            sources[key] = (pdf_path, file_sha256(pdf_path))
+
+    stale = {
+        k: v for k, v in sources.items()
+        if index.get(k, {}).get("sha256") != v[1] or index[k].get("parser_version") != PARSER_VERSION
+    }
+    print(f"Historical PDFs: {len(sources)}; partitions to rebuild: {len(stale)}")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            key: pool.submit(extract_cached, pdf_path, sha256, cache_dir)
+            for key, (pdf_path, sha256) in stale.items()
+        }
+        for key, future in futures.items():
+            pdf_path, sha256 = stale[key]
+            try:
+                cache_path, parsed = future.result()
+            except Exception as e:
+                print(f"Failed to extract {pdf_path.name}: {e}")
+                # Drop whatever an older parser wrote for this date rather than keep serving it.
+                index.pop(key, None)
+                shutil.rmtree(dataset_dir / f"election_date={key}", ignore_errors=True)
+                continue
+
+            df = pd.read_parquet(cache_path)
+            partition_dir = dataset_dir / f"election_date={key}"
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(partition_dir / "part-0.parquet", index=False)
+            index[key] = {
+                "source": pdf_path.name,
+                "sha256": sha256,
+                "parser_version": PARSER_VERSION,
+                "rows": int(len(df)),
+                "path": f"{partition_dir.name}/part-0.parquet",
+            }
+            print(f"{'Parsed' if parsed else 'Cached'} {pdf_path.name}: {len(df)} counties")
+
+    Path(index_path).write_text(json.dumps(dict(sorted(index.items())), indent=2))
+    print(f"Historical dataset ready in {time.perf_counter() - start:.2f}s -> {dataset_dir}")
+    return index
+
+def load_history(dataset_dir=DATASET_DIR, counties=None, columns=None, since=None):
+    filters = []
+    if counties:
+        filters.append(("CountyName", "in", list(counties)))
+    if since:
+        filters.append(("election_date", ">=", since))
+    if columns is not None:
+        columns = list(dict.fromkeys(["election_date", "CountyName", "CountyID", *columns]))
+    df = pd.read_parquet(dataset_dir, columns=columns, filters=filters or None)
+    df["election_date"] = df["election_date"].astype(str)
+    return df.sort_values(["election_date", "CountyID"]).reset_index(drop=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract historical registration PDFs into a Parquet dataset.")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    build_dataset(max_workers=args.workers)
@@ -0,0 +1,119 @@
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+REPORT_NAME = "run_report.json"
+PROFILE_DIR = Path("data/profiles")
+
+_lock = threading.Lock()
+_run = {"started_at_utc": None, "stages": [], "profile": set()}
+_local = threading.local()
+
+def start_run(profile=()):
+    with _lock:
+        _run["started_at_utc"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        _run["stages"] = []
+        _run["profile"] = set(profile or ())
+        _run["wall_start"] = time.perf_counter()
+        _run["cpu_start"] = time.process_time()
+    # tracemalloc is process-wide, so it runs for the whole run and each profiled stage
+    # diffs snapshots; profiled runs execute their stages one at a time.
+    if profile and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def wants_profile(name):
+    profile = _run["profile"]
+    return "all" in profile or name in profile or name.split(":")[0] in profile
+
+def current_stage():
+    # The innermost open stage on this thread, so code deep in a stage can add counters.
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else {}
+
+@contextmanager
+def profiling(name, record):
+    # cProfile and tracemalloc around one stage, written into its record. Parse workers
+    # call this themselves, since a profile taken in the parent only shows the wait.
+    import cProfile
+
+    profiler = cProfile.Profile()
+    tracing = not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        # Work that ran in another process already reported its own profile.
+        if "profile" not in record:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            safe_name = name.replace(":", "_").replace("/", "_")
+            profile_path = PROFILE_DIR / f"{safe_name}.prof"
+            profiler.dump_stats(profile_path)
+            record["profile"] = str(profile_path)
+            record["tracemalloc_peak_bytes"] = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+            growth = tracemalloc.take_snapshot().compare_to(before, "lineno")
+            record["tracemalloc_top"] = [str(s) for s in growth[:10]]
+        if tracing:
+            tracemalloc.stop()
+
+@contextmanager
+def stage(name, **counters):
+    record = {"stage": name, **counters}
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    _local.stack.append(record)
+    try:
+        with profiling(name, record) if wants_profile(name) else nullcontext():
+            yield record
+    finally:
+        _local.stack.pop()
+        record["wall_seconds"] = round(time.perf_counter() - wall_start, 4)
+        record["cpu_seconds"] = round(time.thread_time() - cpu_start, 4)
+        # ru_maxrss only ever grows, so this is the process's high-water mark when the stage
+        # ended, not memory the stage itself used; the tracemalloc numbers are per stage.
+        record.setdefault("rss_high_water_bytes", peak_rss_bytes())
+        with _lock:
+            _run["stages"].append(record)
+
+def write_report(output_dir):
+    with _lock:
+        stages = list(_run["stages"])
+        report = {
+            "started_at_utc": _run["started_at_utc"],
+            "finished_at_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "wall_seconds": round(time.perf_counter() - _run.get("wall_start", time.perf_counter()), 4),
+            "cpu_seconds": round(time.process_time() - _run.get("cpu_start", time.process_time()), 4),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+        }
+    if _run["profile"] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    report_path = Path(output_dir) / REPORT_NAME
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2))
+    print(f"Run report -> {report_path}")
+    return report_path
@@ -0,0 +1,179 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+from helpers.instrument import stage
+
+CACHE_DIR = Path("data/.pipeline")
+
+@dataclass
+class Node:
+    name: str
+    func: Callable
+    deps: tuple = ()
+    modules: tuple = ()
+    memoize: bool = True
+    params: object = None
+
+    def code_version(self):
+        # The module defining the node body always counts, on top of the modules it calls into.
+        func = self.func
+        while isinstance(func, partial):
+            func = func.func
+        modules = dict.fromkeys((inspect.getmodule(func), *self.modules))
+        digest = hashlib.sha256()
+        for module in modules:
+            digest.update(Path(inspect.getsourcefile(module)).read_bytes())
+        return digest.hexdigest()
+
+@dataclass
+class NodeResult:
+    key: str
+    digest: str
+    ran: bool
+    path: Path
+    value: object = field(default=None, repr=False)
+    loaded: bool = False
+
+    def get(self):
+        if not self.loaded:
+            with open(self.path, "rb") as f:
+                self.value = pickle.load(f)
+            self.loaded = True
+        return self.value
+
+class Pipeline:
+    def __init__(self, nodes, cache_dir=CACHE_DIR):
+        self.nodes = {node.name: node for node in nodes}
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / "index.json"
+        for node in nodes:
+            missing = [d for d in node.deps if d not in self.nodes]
+            if missing:
+                raise ValueError(f"Node {node.name} depends on unknown nodes {missing}")
+
+    def ancestors(self, name, seen=None):
+        seen = set() if seen is None else seen
+        for dep in self.nodes[name].deps:
+            if dep not in seen:
+                seen.add(dep)
+                self.ancestors(dep, seen)
+        return seen
+
+    def descendants(self, name):
+        found = set()
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for node in self.nodes.values():
+                if current in node.deps and node.name not in found:
+                    found.add(node.name)
+                    frontier.append(node.name)
+        return found
+
+    def plan(self, targets, only=None):
+        selected = set()
+        for target in targets:
+            selected |= {target} | self.ancestors(target)
+        if only:
+            # Run the chosen nodes, what they need, and what consumes them; everything else
+            # in the plan is served from its last memoized output.
+            wanted = set()
+            for name in only:
+                if name not in self.nodes:
+                    raise ValueError(f"Unknown pipeline node {name!r}; choose from {sorted(self.nodes)}")
+                wanted |= {name} | self.ancestors(name) | self.descendants(name)
+            return selected, selected - wanted
+        return selected, set()
+
+    def load_index(self):
+        try:
+            return json.loads(self.index_path.read_text())
+        except Exception:
+            return {}
+
+    def save_index(self, index):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(index, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.index_path)
+
+    def cached(self, name, index):
+        entry = index.get(name)
+        path = self.cache_dir / f"{name.replace(':', '_')}.pkl"
+        if not entry or not path.exists():
+            return None
+        return NodeResult(entry["key"], entry["digest"], False, path)
+
+    def execute(self, node, results, key):
+        args = [results[dep].get() for dep in node.deps]
+        with stage(node.name):
+            value = node.func(*args)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        path = self.cache_dir / f"{node.name.replace(':', '_')}.pkl"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        return NodeResult(key, hashlib.sha256(payload).hexdigest(), True, path, value, True)
+
+    def run(self, targets=None, only=None, force=False, max_workers=4):
+        targets = targets or [n for n in self.nodes if not self.descendants(n)]
+        selected, frozen = self.plan(targets, only)
+        index = self.load_index()
+        results = {}
+
+        for name in frozen:
+            result = self.cached(name, index)
+            if result is None:
+                raise RuntimeError(f"No memoized output for {name}; run it first")
+            results[name] = result
+
+        pending = {name for name in selected if name not in frozen}
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in sorted(pending):
+                        node = self.nodes[name]
+                        if not all(dep in results for dep in node.deps):
+                            continue
+                        pending.discard(name)
+                        progressed = True
+                        key = hashlib.sha256(json.dumps(
+                            [name, node.code_version(), node.params, [results[d].digest for d in node.deps]]
+                        ).encode()).hexdigest()
+                        previous = self.cached(name, index)
+                        if node.memoize and not force and previous is not None and previous.key == key:
+                            print(f"[pipeline] {name}: unchanged, skipped")
+                            results[name] = previous
+                            continue
+                        running[pool.submit(self.execute, node, results, key)] = name
+
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"Pipeline stalled with {sorted(pending)} unresolved")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    index[name] = {
+                        "key": results[name].key,
+                        "digest": results[name].digest,
+                        "updated_at_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    }
+                    self.save_index(index)
+                    print(f"[pipeline] {name}: done")
+
+        return results
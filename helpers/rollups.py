@@ -0,0 +1,188 @@
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from helpers.artifacts import Artifact
+
+HISTORY_PATH = Path("data/history/rollups.npz")
+WINDOW_DAYS = 31
+
+# geography: (key column, count columns)
+GEOGRAPHIES = {
+    "county": ("CountyName", ['Democrat', 'Republican', 'No Affiliation', 'Other', 'Total']),
+    "congress": ("DistrictCode", ['Democratic', 'Republican', 'Libertarian', 'Green', 'No Affiliation', 'Other', 'Total']),
+    "senate": ("DistrictCode", ['Democratic', 'Republican', 'Libertarian', 'Green', 'No Affiliation', 'Other', 'Total']),
+    "house": ("DistrictCode", ['Democratic', 'Republican', 'Libertarian', 'Green', 'No Affiliation', 'Other', 'Total']),
+}
+
+# Primaries that didn't follow the usual calendar.
+PRIMARY_OVERRIDES = {2020: date(2020, 6, 2)}
+
+def nth_weekday(year, month, weekday, n):
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+def election_dates(year):
+    # PA primaries: 4th Tuesday in April in presidential years, otherwise 3rd Tuesday in May.
+    if year in PRIMARY_OVERRIDES:
+        primary = PRIMARY_OVERRIDES[year]
+    elif year % 4 == 0:
+        primary = nth_weekday(year, 4, 1, 4)
+    else:
+        primary = nth_weekday(year, 5, 1, 3)
+    general = nth_weekday(year, 11, 0, 1) + timedelta(days=1)
+    return [primary, general]
+
+def last_election_before(day):
+    candidates = [d for y in (day.year - 1, day.year) for d in election_dates(y) if d < day]
+    return max(candidates)
+
+def parse_source_date(value):
+    for fmt in ("%m/%d/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def load_state(path=HISTORY_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    state = {}
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        for geo, info in meta.items():
+            state[geo] = {
+                **info,
+                "window": data[f"{geo}__window"],
+                "baseline": data[f"{geo}__baseline"] if f"{geo}__baseline" in data else None,
+            }
+    return state
+
+def save_state(state, path=HISTORY_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {}
+    meta = {}
+    for geo, info in state.items():
+        arrays[f"{geo}__window"] = info["window"]
+        if info["baseline"] is not None:
+            arrays[f"{geo}__baseline"] = info["baseline"]
+        meta[geo] = {k: v for k, v in info.items() if k not in ("window", "baseline")}
+    tmp_path = path.with_name(path.name + ".tmp.npz")
+    np.savez_compressed(tmp_path, meta=np.asarray(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+
+def align(values, old_keys, new_keys):
+    # Re-index stored snapshots onto the current key set; unseen keys become NaN.
+    position = {k: i for i, k in enumerate(old_keys)}
+    idx = np.array([position.get(k, -1) for k in new_keys])
+    out = np.full(values.shape[:-2] + (len(new_keys), values.shape[-1]), np.nan)
+    hit = idx >= 0
+    out[..., hit, :] = values[..., idx[hit], :]
+    return out
+
+def pick(dates, target, candidates=None):
+    # Latest snapshot on or before target; None when history starts after it, so the
+    # change comes out empty instead of a shorter window under the same label.
+    candidates = list(range(len(dates))) if candidates is None else candidates
+    eligible = [i for i in candidates if dates[i] <= target]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda i: dates[i])
+
+def update_geography(info, keys, columns, current, snapshot_date):
+    if info and info["columns"] == columns:
+        window = align(info["window"], info["keys"], keys)
+        baseline = align(info["baseline"], info["keys"], keys) if info["baseline"] is not None else None
+        dates = [date.fromisoformat(d) for d in info["dates"]]
+        baseline_date = info.get("baseline_date")
+        baseline_election = info.get("baseline_election")
+    else:
+        window = np.empty((0, len(keys), len(columns)))
+        baseline = None
+        dates, baseline_date, baseline_election = [], None, None
+
+    # Drop a same-day snapshot so re-runs replace rather than duplicate it.
+    keep = [i for i, d in enumerate(dates) if d != snapshot_date]
+    window = window[keep]
+    dates = [dates[i] for i in keep]
+
+    election = last_election_before(snapshot_date)
+    # A baseline dated after its election was seeded from a later run, not the election.
+    stale = baseline_date is not None and baseline_date > election.isoformat()
+    if baseline_election != election.isoformat() or stale:
+        i = pick(dates, election)
+        if i is not None:
+            baseline, baseline_date = window[i].copy(), dates[i].isoformat()
+        else:
+            baseline, baseline_date = None, None
+        baseline_election = election.isoformat()
+
+    prior = [i for i, d in enumerate(dates) if d < snapshot_date]
+    day_idx = pick(dates, snapshot_date, prior)
+    month_idx = pick(dates, snapshot_date - timedelta(days=30), prior)
+
+    deltas = {
+        "1d": (current - window[day_idx], dates[day_idx].isoformat()) if day_idx is not None else (None, None),
+        "30d": (current - window[month_idx], dates[month_idx].isoformat()) if month_idx is not None else (None, None),
+        "since election": (current - baseline, baseline_date) if baseline is not None else (None, None),
+    }
+
+    window = np.concatenate([window, current[None]])
+    dates.append(snapshot_date)
+    # Keep the last WINDOW_DAYS of snapshots plus the newest one older than that,
+    # which is what the next 30-day comparison may need.
+    order = list(np.argsort(np.array(dates, dtype="datetime64[D]")))
+    cutoff = snapshot_date - timedelta(days=WINDOW_DAYS)
+    older = [i for i in order if dates[i] < cutoff]
+    order = older[-1:] + [i for i in order if dates[i] >= cutoff]
+    new_info = {
+        "keys": list(keys),
+        "columns": list(columns),
+        "dates": [dates[i].isoformat() for i in order],
+        "window": window[order],
+        "baseline": baseline,
+        "baseline_date": baseline_date,
+        "baseline_election": baseline_election,
+    }
+    return new_info, deltas
+
+def changes_frame(key_column, keys, columns, current, deltas):
+    df = pd.DataFrame({key_column: keys})
+    for j, col in enumerate(columns):
+        df[col] = current[:, j].astype(np.int64)
+        for label, (delta, _) in deltas.items():
+            values = delta[:, j] if delta is not None else np.full(len(keys), np.nan)
+            df[f"{col} {label}"] = pd.array(np.where(np.isnan(values), None, values), dtype="Int64")
+    return df
+
+def update_rollups(artifacts, snapshot_date, path=HISTORY_PATH):
+    state = load_state(path)
+    outputs = []
+    for artifact in artifacts:
+        if artifact.name not in GEOGRAPHIES:
+            continue
+        key_column, wanted = GEOGRAPHIES[artifact.name]
+        frame = artifact.frame
+        columns = [c for c in wanted if c in frame.columns]
+        keys = frame[key_column].tolist()
+        current = frame[columns].to_numpy(dtype=np.float64)
+
+        state[artifact.name], deltas = update_geography(state.get(artifact.name), keys, columns, current, snapshot_date)
+        outputs.append(Artifact(f"changes_{artifact.name}", f"changes_{artifact.name}.json",
+                                changes_frame(key_column, keys, columns, current, deltas), {
+            "as_of": snapshot_date.isoformat(),
+            "compared_to": {label: since for label, (_, since) in deltas.items()},
+            "last_election": state[artifact.name]["baseline_election"],
+        }))
+        print(f"Rollups {artifact.name}: compared {snapshot_date} with {outputs[-1].metadata['compared_to']}")
+
+    if outputs:
+        save_state(state, path)
+    return outputs
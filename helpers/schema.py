@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Cells DOS leaves for "none" in otherwise numeric columns.
+BLANK_CELLS = ("", "-", "–", "—")
+MAX_ERRORS_SHOWN = 5
+
+class SchemaError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    dtype: str
+    aliases: tuple = ()
+    required: bool = False
+
+@dataclass(frozen=True)
+class Schema:
+    name: str
+    columns: tuple
+    parts: tuple = ()
+    total: str | None = None
+
+    @property
+    def renames(self):
+        return {alias: col.name for col in self.columns for alias in col.aliases}
+
+    @property
+    def counts(self):
+        return [col.name for col in self.columns if col.dtype in ("int32", "uint32")]
+
+def to_numbers(values):
+    # Workbook cells are already ints for almost every row, so only the stragglers
+    # (strings like "1,234") take the slower string path.
+    numbers = pd.to_numeric(values, errors="coerce")
+    stragglers = numbers.isna() & values.notna()
+    if stragglers.any():
+        text = values[stragglers].astype(str).str.replace(",", "", regex=False).str.strip()
+        text = text.mask(text.isin(BLANK_CELLS), "0")
+        numbers = numbers.astype("float64")
+        numbers[stragglers] = pd.to_numeric(text, errors="coerce")
+    bad = numbers.isna() & values.notna()
+    return numbers.fillna(0), bad
+
+def parse(frame, schema):
+    frame = frame.rename(columns=schema.renames)
+    problems = []
+
+    missing = [col.name for col in schema.columns if col.required and col.name not in frame.columns]
+    if missing:
+        raise SchemaError(f"{schema.name}: missing required column(s) {missing}; found {list(frame.columns)}")
+
+    for col in schema.columns:
+        if col.name not in frame.columns:
+            continue
+        values = frame[col.name]
+        if col.dtype == "category":
+            frame[col.name] = values.astype(str).astype("category")
+            continue
+        numbers, bad = to_numbers(values)
+        if bad.any():
+            problems.append(f"{col.name}: non-numeric values {values[bad].head(MAX_ERRORS_SHOWN).tolist()}")
+        if col.name in schema.counts and (numbers < 0).any():
+            problems.append(f"{col.name}: negative counts in rows {np.flatnonzero(numbers < 0)[:MAX_ERRORS_SHOWN].tolist()}")
+        limits = np.iinfo(col.dtype)
+        if len(numbers) and (numbers.max() > limits.max or numbers.min() < limits.min):
+            problems.append(f"{col.name}: values outside the {col.dtype} range")
+            continue
+        frame[col.name] = numbers.to_numpy().astype(col.dtype)
+
+    parts = [c for c in schema.parts if c in frame.columns]
+    if schema.total and parts:
+        if schema.total in frame.columns:
+            if not problems:
+                problems.extend(check_totals(frame, schema.total, parts))
+        else:
+            frame[schema.total] = frame[parts].sum(axis=1).astype(schema_dtype(schema, schema.total))
+
+    if problems:
+        raise SchemaError(f"{schema.name}: malformed source data; " + "; ".join(problems))
+    return frame
+
+def schema_dtype(schema, name):
+    return next(col.dtype for col in schema.columns if col.name == name)
+
+def check_totals(frame, total, parts):
+    summed = frame[parts].to_numpy(dtype=np.int64).sum(axis=1)
+    mismatched = np.flatnonzero(summed != frame[total].to_numpy(dtype=np.int64))
+    if not len(mismatched):
+        return []
+    return [f"{total} does not equal the sum of {parts} in {len(mismatched)} row(s), "
+            f"first at rows {mismatched[:MAX_ERRORS_SHOWN].tolist()}"]
+
+COUNTY = Schema(
+    "county",
+    (
+        Column("CountyName", "category", required=True),
+        Column("CountyID", "int16"),
+        Column("Democrat", "int32", ("Dem",)),
+        Column("Republican", "int32", ("Rep",)),
+        Column("No Affiliation", "int32", ("No Aff",)),
+        Column("Other", "int32"),
+        Column("Total", "int32", ("Total Count of All Voters",)),
+    ),
+    parts=("Democrat", "Republican", "No Affiliation", "Other"),
+    total="Total",
+)
+
+DISTRICT_COUNTS = (
+    Column("Democratic", "int32", ("Dem", "Democrat")),
+    Column("Republican", "int32", ("Rep",)),
+    Column("Libertarian", "int32"),
+    Column("Green", "int32"),
+    Column("No Affiliation", "int32", ("No Aff",)),
+    Column("Other", "int32"),
+    Column("Total", "int32", ("Total Count of All Voters",)),
+)
+DISTRICT_PARTIES = ("Democratic", "Republican", "Libertarian", "Green", "No Affiliation", "Other")
+
+DISTRICT = Schema(
+    "district",
+    (Column("DistrictCode", "int16", required=True), *DISTRICT_COUNTS),
+    parts=DISTRICT_PARTIES,
+    total="Total",
+)
+
+DISTRICT_BREAKDOWN = Schema(
+    "district_breakdown",
+    (Column("DistrictCode", "int16", required=True), Column("CountyName", "category", required=True), *DISTRICT_COUNTS),
+    parts=DISTRICT_PARTIES,
+    total="Total",
+)
+
+SCHEMAS = {
+    "county": COUNTY,
+    "congress": DISTRICT,
+    "senate": DISTRICT,
+    "house": DISTRICT,
+    "district_breakdown": DISTRICT_BREAKDOWN,
+}
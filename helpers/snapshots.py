@@ -0,0 +1,98 @@
+import bisect
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+from helpers.fetch import file_sha256
+from helpers.instrument import REPORT_NAME
+
+SNAPSHOT_DIR = Path("data/snapshots")
+
+def blob_name(sha256, suffix=""):
+    return f"{sha256[:2]}/{sha256}{suffix}"
+
+def build_manifest(snapshot_date, files):
+    return {
+        "date": snapshot_date,
+        "created_at_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "files": dict(sorted(files.items())),
+    }
+
+def describe_file(file_path, sha256=None):
+    file_path = Path(file_path)
+    sha256 = sha256 or file_sha256(file_path)
+    return {
+        "sha256": sha256,
+        "size": file_path.stat().st_size,
+        "blob": blob_name(sha256, file_path.suffix),
+    }
+
+def snapshot_local(processed_dir, snapshot_date, root=SNAPSHOT_DIR):
+    root = Path(root)
+    files = {}
+    new_blobs = 0
+    for file_path in sorted(Path(processed_dir).glob("*")):
+        if not file_path.is_file() or file_path.name == REPORT_NAME:
+            continue
+        entry = describe_file(file_path)
+        blob_path = root / "blobs" / entry["blob"]
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = blob_path.with_name(blob_path.name + ".tmp")
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, blob_path)
+            new_blobs += 1
+        files[file_path.name] = entry
+
+    manifest = build_manifest(snapshot_date, files)
+    manifest_path = root / "manifests" / f"{snapshot_date}.json"
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    print(f"Snapshot {snapshot_date}: {len(files)} files, {new_blobs} new blobs -> {manifest_path}")
+    return manifest
+
+def list_snapshots(root=SNAPSHOT_DIR):
+    return sorted(p.stem for p in (Path(root) / "manifests").glob("*.json"))
+
+def resolve_snapshot(snapshot_date, dates):
+    # Manifests are only written on days the outputs changed, so a date means
+    # "the file set as of that day": the latest manifest on or before it.
+    i = bisect.bisect_right(dates, str(snapshot_date))
+    if not i:
+        raise FileNotFoundError(f"No snapshot on or before {snapshot_date}")
+    return dates[i - 1]
+
+def read_manifest(snapshot_date, root=SNAPSHOT_DIR):
+    resolved = resolve_snapshot(snapshot_date, list_snapshots(root))
+    return json.loads((Path(root) / "manifests" / f"{resolved}.json").read_text())
+
+def restore(snapshot_date, dest_dir, root=SNAPSHOT_DIR):
+    root = Path(root)
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(snapshot_date, root)
+    for name, entry in manifest["files"].items():
+        shutil.copyfile(root / "blobs" / entry["blob"], dest_dir / name)
+    return [dest_dir / name for name in manifest["files"]]
+
+def list_s3_snapshots(s3_client, bucket_name, archive_prefix):
+    prefix = f"{archive_prefix}manifests/"
+    dates = []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket_name, Prefix=prefix):
+        dates.extend(Path(obj["Key"]).stem for obj in page.get("Contents", []) if obj["Key"].endswith(".json"))
+    return sorted(dates)
+
+def read_s3_manifest(s3_client, bucket_name, archive_prefix, snapshot_date):
+    resolved = resolve_snapshot(snapshot_date, list_s3_snapshots(s3_client, bucket_name, archive_prefix))
+    obj = s3_client.get_object(Bucket=bucket_name, Key=f"{archive_prefix}manifests/{resolved}.json")
+    return json.loads(obj["Body"].read())
+
+def restore_from_s3(s3_client, bucket_name, archive_prefix, snapshot_date, dest_dir):
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_s3_manifest(s3_client, bucket_name, archive_prefix, snapshot_date)
+    for name, entry in manifest["files"].items():
+        s3_client.download_file(bucket_name, f"{archive_prefix}blobs/{entry['blob']}", str(dest_dir / name))
+    return [dest_dir / name for name in manifest["files"]]
@@ -1,85 +1,288 @@
 import boto3
+import gzip
+import hashlib
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv, find_dotenv
-load_dotenv(find_dotenv())
-
+from botocore.exceptions import ClientError
+from helpers.instrument import REPORT_NAME, current_stage, stage
+from helpers.snapshots import build_manifest, describe_file
 from datetime import date
 
-def upload_to_s3():
-    bucket_name = os.environ.get('S3_BUCKET_NAME')
-    aws_region = os.environ.get('AWS_REGION')
+S3_BASE_PATH = "2025/voter-registration/"
+ARCHIVE_PREFIX = f"{S3_BASE_PATH}archive/"
+MAX_WORKERS = 8
+CHUNK_SIZE = 1024 * 1024
+# Live keys change daily; archive blobs are content-addressed and never change.
+LIVE_CACHE_CONTROL = 'public, max-age=300, stale-while-revalidate=60'
+ARCHIVE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+COMPRESSIBLE_SUFFIXES = ('.json', '.csv')
 
-    if not bucket_name:
-        raise ValueError("S3_BUCKET_NAME environment variable is not set")
-
-    s3_client = boto3.client(
+def make_client(aws_region):
+    return boto3.client(
         's3',
         region_name=aws_region,
+        endpoint_url=os.environ.get('S3_ENDPOINT_URL') or None,
         aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
         aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY')
     )
 
-    processed_dir = Path("data/processed")
-    s3_base_path = "2025/voter-registration/"
+def file_digests(file_path):
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            md5.update(chunk)
+            sha256.update(chunk)
+    return md5.hexdigest(), sha256.hexdigest()
+
+def remote_matches(s3_client, bucket_name, s3_key, md5, sha256, cache_control=LIVE_CACHE_CONTROL):
+    try:
+        head = s3_client.head_object(Bucket=bucket_name, Key=s3_key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+    # Re-upload once when the caching policy changes, even if the bytes haven't.
+    if head.get('CacheControl') != cache_control:
+        return False
+    # Multipart uploads don't carry a plain MD5 ETag, so prefer our own digest metadata.
+    if head.get('Metadata', {}).get('sha256') == sha256:
+        return True
+    return head.get('ETag', '').strip('"') == md5
+
+def compressed_variants(file_path):
+    # encoding -> (suffix, body); body is None when the variant wouldn't be smaller than the file.
+    if file_path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+        return {}
+    data = file_path.read_bytes()
+    # mtime=0 keeps the gzip bytes identical for identical input.
+    variants = {'gzip': ('.gz', gzip.compress(data, compresslevel=9, mtime=0))}
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    if brotli is not None:
+        variants['br'] = ('.br', brotli.compress(data, quality=11))
+    return {encoding: (suffix, body) if len(body) < len(data) else (suffix, None)
+            for encoding, (suffix, body) in variants.items()}
+
+def remove_variant(s3_client, bucket_name, s3_key):
+    # A variant that no longer shrinks its file goes unpublished; drop one an earlier run
+    # published so it can't serve stale bytes.
+    try:
+        s3_client.head_object(Bucket=bucket_name, Key=s3_key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+    s3_client.delete_object(Bucket=bucket_name, Key=s3_key)
+    return True
+
+def publish_variant(s3_client, bucket_name, s3_key, content_type, sha256, encoding, body):
+    # Variants carry the source file's digest, so they're skipped exactly when the source is.
+    if remote_matches(s3_client, bucket_name, s3_key, hashlib.md5(body).hexdigest(), sha256):
+        return False
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=s3_key,
+        Body=body,
+        ACL='public-read',
+        ContentType=content_type,
+        ContentEncoding=encoding,
+        CacheControl=LIVE_CACHE_CONTROL,
+        Metadata={'sha256': sha256}
+    )
+    return True
+
+def ensure_blob(s3_client, bucket_name, s3_key, blob_key, content_type, sha256):
+    try:
+        s3_client.head_object(Bucket=bucket_name, Key=blob_key)
+        return False
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+            raise
+    # New content: copy it server-side from the live key we just published,
+    # swapping the live key's short cache lifetime for an immutable one.
+    s3_client.copy_object(
+        Bucket=bucket_name,
+        Key=blob_key,
+        CopySource={'Bucket': bucket_name, 'Key': s3_key},
+        ACL='public-read',
+        ContentType=content_type,
+        CacheControl=ARCHIVE_CACHE_CONTROL,
+        Metadata={'sha256': sha256},
+        MetadataDirective='REPLACE'
+    )
+    return True
+
+def publish_file(s3_client, bucket_name, aws_region, file_path):
+    s3_key = f"{S3_BASE_PATH}{file_path.name}"
+    content_type = get_content_type(file_path.suffix)
+    size = file_path.stat().st_size
+    md5, sha256 = file_digests(file_path)
+    entry = describe_file(file_path, sha256)
+
+    result = {
+        'urls': [], 'uploaded_bytes': 0, 'saved_bytes': 0, 'skipped': False, 'entry': entry,
+        'compression': {'bytes': size},
+    }
+    public_url = f"https://{bucket_name}.s3.{aws_region}.amazonaws.com/{s3_key}"
+    if remote_matches(s3_client, bucket_name, s3_key, md5, sha256):
+        print(f"= Unchanged: {file_path.name}")
+        result['skipped'] = True
+        result['saved_bytes'] += size
+    else:
+        s3_client.upload_file(
+            str(file_path),
+            bucket_name,
+            s3_key,
+            ExtraArgs={
+                'ACL': 'public-read',
+                'ContentType': content_type,
+                'CacheControl': LIVE_CACHE_CONTROL,
+                'Metadata': {'sha256': sha256}
+            }
+        )
+        print(f"✓ Uploaded: {file_path.name}")
+        print(f"  URL: {public_url}")
+        result['uploaded_bytes'] += size
+    result['urls'].append(public_url)
+
+    for encoding, (suffix, body) in compressed_variants(file_path).items():
+        if body is None:
+            if remove_variant(s3_client, bucket_name, s3_key + suffix):
+                print(f"  Removed {s3_key + suffix}: no smaller than the original")
+            continue
+        if publish_variant(s3_client, bucket_name, s3_key + suffix, content_type, sha256, encoding, body):
+            result['uploaded_bytes'] += len(body)
+        else:
+            result['saved_bytes'] += len(body)
+        result['compression'][encoding] = len(body)
+        result['urls'].append(f"{public_url}{suffix}")
+
+    blob_key = f"{ARCHIVE_PREFIX}blobs/{entry['blob']}"
+    if ensure_blob(s3_client, bucket_name, s3_key, blob_key, content_type, sha256):
+        print(f"  Archived blob: {blob_key}")
+    else:
+        result['saved_bytes'] += size
+    return result
+
+def publish_manifest(s3_client, bucket_name, aws_region, today, files):
+    manifest_key = f"{ARCHIVE_PREFIX}manifests/{today}.json"
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=manifest_key,
+        Body=json.dumps(build_manifest(today, files), indent=2).encode(),
+        ACL='public-read',
+        ContentType='application/json',
+        # Re-runs on the same day rewrite today's manifest, so it can't be immutable yet.
+        CacheControl=LIVE_CACHE_CONTROL
+    )
+    manifest_url = f"https://{bucket_name}.s3.{aws_region}.amazonaws.com/{manifest_key}"
+    print(f"Archive manifest: {manifest_url}")
+    return manifest_url
+
+def upload_to_s3(processed_dir="data/processed", max_workers=MAX_WORKERS):
+    bucket_name = os.environ.get('S3_BUCKET_NAME')
+    aws_region = os.environ.get('AWS_REGION')
+
+    if not bucket_name:
+        raise ValueError("S3_BUCKET_NAME environment variable is not set")
+
+    s3_client = make_client(aws_region)
+    processed_dir = Path(processed_dir)
 
     print(f"Uploading to bucket: {bucket_name}")
-    print(f"S3 path: {s3_base_path}")
+    print(f"S3 path: {S3_BASE_PATH}")
 
     if not processed_dir.exists():
         print(f"Warning: {processed_dir} does not exist")
         return
 
+    today = date.today().strftime("%Y-%m-%d")
+    files = [p for p in sorted(processed_dir.glob("*")) if p.is_file() and p.name != REPORT_NAME]
+
+    # Inside the pipeline the publish node already has a stage open; count into it.
+    record = current_stage()
+    if record:
+        return publish_files(s3_client, bucket_name, aws_region, files, today, max_workers, record)
+    with stage("publish") as record:
+        return publish_files(s3_client, bucket_name, aws_region, files, today, max_workers, record)
+
+def publish_files(s3_client, bucket_name, aws_region, files, today, max_workers, record):
     uploaded_files = []
-    for file_path in processed_dir.glob("*"):
-        if file_path.is_file():
-            s3_key = f"{s3_base_path}{file_path.name}"
-            content_type = get_content_type(file_path.suffix)
+    manifest_files = {}
+    compression = {}
+    uploaded_bytes = 0
+    saved_bytes = 0
+    skipped = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(publish_file, s3_client, bucket_name, aws_region, file_path): file_path
+            for file_path in files
+        }
+        for future, file_path in futures.items():
             try:
-                s3_client.upload_file(
-                    str(file_path),
-                    bucket_name,
-                    s3_key,
-                    ExtraArgs={
-                        'ACL': 'public-read',
-                        'ContentType': content_type
-                    }
-                )
-                public_url = f"https://{bucket_name}.s3.{aws_region}.amazonaws.com/{s3_key}"
-                print(f"✓ Uploaded: {file_path.name}")
-                print(f"  URL: {public_url}")
-                uploaded_files.append(public_url)
-
-                # Archive copy with date prefix
-                today = date.today().strftime("%Y-%m-%d")
-                archive_key = f"{s3_base_path}archive/{today}/{file_path.name}"
-                s3_client.upload_file(
-                    str(file_path),
-                    bucket_name,
-                    archive_key,
-                    ExtraArgs={
-                        'ACL': 'public-read',
-                        'ContentType': content_type
-                    }
-                )
-                archive_url = f"https://{bucket_name}.s3.{aws_region}.amazonaws.com/{archive_key}"
-                print(f"  Archived: {archive_url}")
-                uploaded_files.append(archive_url)
+                result = future.result()
             except Exception as e:
                 print(f"Failed to upload {file_path.name}: {str(e)}")
+                failed.append(file_path.name)
+                continue
+            uploaded_files.extend(result['urls'])
+            manifest_files[file_path.name] = result['entry']
+            if len(result['compression']) > 1:
+                compression[file_path.name] = result['compression']
+            uploaded_bytes += result['uploaded_bytes']
+            saved_bytes += result['saved_bytes']
+            skipped += result['skipped']
 
-    print(f"\nTotal files uploaded: {len(uploaded_files)}")
+    if failed:
+        record["failed"] = len(failed)
+        # Fail the run so the pipeline doesn't memoize a partial publish; the next run
+        # retries and skips everything that already made it up.
+        raise RuntimeError(f"Failed to publish {len(failed)} file(s): {', '.join(sorted(failed))}")
+
+    if manifest_files:
+        uploaded_files.append(publish_manifest(s3_client, bucket_name, aws_region, today, manifest_files))
+
+    print_compression(compression)
+    print(f"\nTotal files published: {len(uploaded_files)} ({skipped} unchanged)")
+    print(f"Bytes uploaded: {uploaded_bytes:,}; bytes saved: {saved_bytes:,}")
+    record.update({
+        "files": len(files),
+        "unchanged": skipped,
+        "bytes_transferred": uploaded_bytes,
+        "bytes_saved": saved_bytes,
+        "compression": compression,
+    })
     return uploaded_files
 
+def print_compression(compression):
+    if not compression:
+        return
+    print("\nCompressed variants (bytes, ratio to original):")
+    for name, sizes in sorted(compression.items()):
+        variants = ", ".join(
+            f"{encoding} {size:,} ({size / sizes['bytes']:.1%})"
+            for encoding, size in sizes.items() if encoding != 'bytes' and sizes['bytes']
+        )
+        print(f"  {name}: {sizes['bytes']:,} -> {variants}")
+
 def get_content_type(extension):
     content_types = {
         '.xls': 'application/vnd.ms-excel',
         '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
         '.csv': 'text/csv',
         '.json': 'application/json',
+        '.parquet': 'application/vnd.apache.parquet',
         '.txt': 'text/plain'
     }
     return content_types.get(extension.lower(), 'application/octet-stream')
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv, find_dotenv
+    load_dotenv(find_dotenv())
     upload_to_s3()
@@ -0,0 +1,134 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from helpers.artifacts import Artifact
+from helpers.schema import SCHEMAS
+
+PROCESSED_DIR = Path("data/processed")
+# geography: key column the view is sorted and looked up by
+GEOGRAPHIES = {
+    "county": "CountyName",
+    "congress": "DistrictCode",
+    "senate": "DistrictCode",
+    "house": "DistrictCode",
+}
+DEMOCRAT_COLUMNS = ("Democrat", "Democratic")
+DELTA_WINDOWS = ("30d", "since election")
+
+def shares_of(counts, totals):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(totals[:, None] > 0, counts / totals[:, None] * 100, 0.0)
+    return np.round(shares, 2)
+
+def rank_columns(values):
+    # Rank 1 is the highest share; percentile is the share of geographies at or below this one.
+    frame = pd.DataFrame(values)
+    ranks = frame.rank(ascending=False, method="min").to_numpy(dtype=np.int16)
+    percentiles = np.round(frame.rank(ascending=True, method="max", pct=True).to_numpy() * 100, 1)
+    return ranks, percentiles
+
+def share_deltas(counts, totals, changes, key_column, keys, parties, window):
+    # Compare today's party shares with the shares implied by the rollup's earlier snapshot.
+    if changes is None:
+        return None
+    aligned = changes.set_index(key_column).reindex(keys)
+    columns = [f"{p} {window}" for p in parties] + [f"Total {window}"]
+    if any(c not in aligned.columns for c in columns):
+        return None
+    deltas = aligned[columns].astype("float64").to_numpy()
+    before = np.column_stack([counts, totals]) - deltas
+    before_shares = shares_of(before[:, :-1], before[:, -1])
+    deltas = np.round(shares_of(counts, totals) - before_shares, 2)
+    # No earlier snapshot for this window yet: leave the change empty rather than zero.
+    deltas[np.isnan(before[:, -1])] = np.nan
+    return deltas
+
+def build_view(artifact, changes=None):
+    key_column = GEOGRAPHIES[artifact.name]
+    schema = SCHEMAS[artifact.name]
+    frame = artifact.frame.sort_values(key_column).reset_index(drop=True)
+    parties = [p for p in schema.parts if p in frame.columns]
+    keys = frame[key_column].to_numpy()
+    counts = frame[parties].to_numpy(dtype=np.float64)
+    totals = frame["Total"].to_numpy(dtype=np.float64)
+    shares = shares_of(counts, totals)
+    ranks, percentiles = rank_columns(shares)
+
+    view = {key_column: keys, "Total": frame["Total"].to_numpy(dtype=np.int32)}
+    for j, party in enumerate(parties):
+        view[party] = frame[party].to_numpy(dtype=np.int32)
+        view[f"{party} Share"] = shares[:, j]
+        view[f"{party} Share Rank"] = ranks[:, j]
+        view[f"{party} Share Percentile"] = percentiles[:, j]
+
+    dem = next((p for p in DEMOCRAT_COLUMNS if p in parties), None)
+    if dem and "Republican" in parties:
+        d, r = parties.index(dem), parties.index("Republican")
+        margin_share = np.round(shares[:, d] - shares[:, r], 2)
+        margin_ranks, margin_percentiles = rank_columns(margin_share[:, None])
+        view["D-R Margin"] = (counts[:, d] - counts[:, r]).astype(np.int32)
+        view["D-R Margin Share"] = margin_share
+        view["D-R Margin Rank"] = margin_ranks[:, 0]
+        view["D-R Margin Percentile"] = margin_percentiles[:, 0]
+
+    for window in DELTA_WINDOWS:
+        deltas = share_deltas(counts, totals, changes, key_column, keys, parties, window)
+        if deltas is None:
+            continue
+        for j, party in enumerate(parties):
+            view[f"{party} Share Change {window}"] = deltas[:, j]
+
+    df = pd.DataFrame(view)
+    print(f"View {artifact.name}: {len(df)} rows, {len(df.columns)} columns")
+    return Artifact(f"view_{artifact.name}", f"view_{artifact.name}.json", df, {
+        "geography": artifact.name,
+        "key": key_column,
+        "parties": parties,
+        "rows": int(len(df)),
+    })
+
+def build_views(artifacts):
+    by_name = {a.name: a for a in artifacts}
+    views = []
+    for name in GEOGRAPHIES:
+        if name in by_name:
+            changes = by_name.get(f"changes_{name}")
+            views.append(build_view(by_name[name], changes.frame if changes is not None else None))
+    return views
+
+class View:
+    # A materialized view sorted by its key, so lookups are a binary search over one array.
+    def __init__(self, geography, frame):
+        self.geography = geography
+        self.key = GEOGRAPHIES[geography]
+        keys = frame[self.key].to_numpy()
+        if self.key == "CountyName":
+            keys = np.asarray([str(k).lower() for k in keys])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self.arrays = {col: self.frame[col].to_numpy() for col in self.frame.columns}
+
+    @classmethod
+    def load(cls, geography, processed_dir=PROCESSED_DIR):
+        path = Path(processed_dir) / f"view_{geography}.parquet"
+        if path.exists():
+            return cls(geography, pd.read_parquet(path))
+        return cls(geography, pd.read_json(Path(processed_dir) / f"view_{geography}.json", orient="records"))
+
+    def lookup(self, key):
+        needle = str(key).strip().lower() if self.key == "CountyName" else int(key)
+        pos = np.searchsorted(self.keys, needle)
+        if pos >= len(self.keys) or self.keys[pos] != needle:
+            return None
+        row = {col: values[pos] for col, values in self.arrays.items()}
+        return {col: value.item() if isinstance(value, np.generic) else value for col, value in row.items()}
+
+    def top(self, metric, n=10):
+        # metric is a ranked column stem, e.g. "Democrat Share" or "D-R Margin".
+        return self.frame.nsmallest(n, f"{metric} Rank", keep="all")
+
+def load_view(geography, processed_dir=PROCESSED_DIR):
+    return View.load(geography, processed_dir)
@@ -0,0 +1,184 @@
+import argparse
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from helpers.artifacts import Artifact, write_artifacts
+from helpers.county import add_share_columns
+from helpers.geography import COUNTY_BY_KEY, COUNTY_ID, PA_COUNTIES, county_key
+
+# Full Voter Export files are tab-delimited with no header row, one file per county.
+PARTY_FIELD = 11
+# Districts 1-40 of the export start at this field; which chamber each holds follows the
+# county's election map, shipped alongside its export as "<COUNTY> Election Map <date>.txt".
+FIRST_DISTRICT_FIELD = 30
+# Used for a county without an election map; override with --district-field.
+DISTRICT_FIELDS = {"congress": 30, "senate": 31, "house": 32}
+# Election map rows: county, district number, district name, district abbreviation.
+CHAMBER_PATTERNS = {
+    "congress": r"^CG|CONGRESS",
+    "senate": r"^STS|SENAT",
+    "house": r"^STH|REPRESENTATIVE|HOUSE",
+}
+
+PARTIES = ['Democratic', 'Republican', 'Libertarian', 'Green', 'No Affiliation', 'Other']
+PARTY_CODES = {"D": 0, "R": 1, "LN": 2, "GR": 3, "NF": 4}
+OTHER = PARTIES.index('Other')
+MAX_DISTRICT = 256
+CHUNK_ROWS = 200_000
+
+def county_from_filename(path):
+    stem = Path(path).stem.upper()
+    name = re.split(r"\s+FVE\b", stem)[0]
+    county = COUNTY_BY_KEY.get(county_key(name))
+    if county is None:
+        raise ValueError(f"Can't tell which county {Path(path).name} belongs to")
+    return county
+
+def election_map_for(path):
+    path = Path(path)
+    county = county_from_filename(path)
+    for candidate in sorted(path.parent.glob("*Election Map*.txt")):
+        name = re.split(r"\s+ELECTION MAP\b", candidate.stem.upper())[0]
+        if COUNTY_BY_KEY.get(county_key(name)) == county:
+            return candidate
+    return None
+
+def read_election_map(path, chambers=DISTRICT_FIELDS):
+    rows = pd.read_csv(path, sep="\t", header=None, usecols=[1, 2, 3], dtype=str,
+                       quotechar='"', keep_default_na=False, encoding="latin-1")
+    labels = (rows[3].str.strip() + " " + rows[2].str.strip()).str.upper()
+    fields = {}
+    for chamber in chambers:
+        matches = rows[1][labels.str.contains(CHAMBER_PATTERNS[chamber])]
+        if matches.empty:
+            raise ValueError(f"{Path(path).name} has no {chamber} district")
+        fields[chamber] = FIRST_DISTRICT_FIELD + int(matches.iloc[0]) - 1
+    return fields
+
+def county_district_fields(paths, default=DISTRICT_FIELDS):
+    # One {chamber: field} mapping per export file, from its election map when one ships with it.
+    fields = []
+    for path in paths:
+        election_map = election_map_for(path)
+        fields.append(read_election_map(election_map, default) if election_map else dict(default))
+    return fields
+
+def party_index(codes):
+    return codes.map(PARTY_CODES).fillna(OTHER).to_numpy(dtype=np.int64)
+
+def district_index(codes):
+    # Zone codes look like "STH077" or plain "77"; the trailing digits are the district.
+    numbers = pd.to_numeric(codes.str.extract(r"(\d+)\s*$", expand=False), errors="coerce")
+    numbers = numbers.fillna(0).to_numpy(dtype=np.int64)
+    # Codes past the last district are bad data, not district 255: count them as unassigned.
+    return np.where((numbers < 0) | (numbers >= MAX_DISTRICT), 0, numbers)
+
+def aggregate_file(path, district_fields=DISTRICT_FIELDS, chunk_rows=CHUNK_ROWS):
+    county_id = COUNTY_ID[county_from_filename(path)]
+    n_parties = len(PARTIES)
+    county_counts = np.zeros(n_parties, dtype=np.int64)
+    district_counts = {chamber: np.zeros((MAX_DISTRICT, n_parties), dtype=np.int64) for chamber in district_fields}
+
+    usecols = [PARTY_FIELD, *district_fields.values()]
+    reader = pd.read_csv(
+        path, sep="\t", header=None, usecols=usecols, dtype=str,
+        chunksize=chunk_rows, quotechar='"', keep_default_na=False, encoding="latin-1",
+    )
+    rows = 0
+    for chunk in reader:
+        parties = party_index(chunk[PARTY_FIELD].str.strip())
+        county_counts += np.bincount(parties, minlength=n_parties)
+        for chamber, field in district_fields.items():
+            keys = district_index(chunk[field]) * n_parties + parties
+            district_counts[chamber] += np.bincount(keys, minlength=MAX_DISTRICT * n_parties).reshape(MAX_DISTRICT, n_parties)
+        rows += len(chunk)
+
+    return {"county_id": county_id, "county": county_counts, "districts": district_counts, "rows": rows}
+
+def combine(partials, district_fields):
+    n_parties = len(PARTIES)
+    counties = np.zeros((len(PA_COUNTIES) + 1, n_parties), dtype=np.int64)
+    districts = {chamber: np.zeros((MAX_DISTRICT, n_parties), dtype=np.int64) for chamber in district_fields}
+    for part in partials:
+        counties[part["county_id"]] += part["county"]
+        for chamber, counts in part["districts"].items():
+            districts[chamber] += counts
+    return counties, districts
+
+def county_frame(counties):
+    present = np.flatnonzero(counties.sum(axis=1))
+    c = counties[present]
+    df = pd.DataFrame({
+        'CountyName': [PA_COUNTIES[i - 1] for i in present],
+        'CountyID': present.astype(int),
+        'Democrat': c[:, 0],
+        'Republican': c[:, 1],
+        'No Affiliation': c[:, 4],
+        'Other': c[:, 2] + c[:, 3] + c[:, 5],
+    })
+    df['Total'] = c.sum(axis=1)
+    return add_share_columns(df)
+
+def district_frame(counts):
+    # District 0 collects voters with no usable district code; it's reported as "unassigned".
+    present = [d for d in np.flatnonzero(counts.sum(axis=1)) if d > 0]
+    df = pd.DataFrame(counts[present], columns=PARTIES)
+    df.insert(0, 'DistrictCode', np.asarray(present, dtype=int))
+    df['Total'] = counts[present].sum(axis=1)
+    return df
+
+def aggregate(paths, district_fields=DISTRICT_FIELDS, max_workers=None, chunk_rows=CHUNK_ROWS):
+    start = time.perf_counter()
+    paths = [Path(p) for p in paths]
+    file_fields = county_district_fields(paths, district_fields)
+    if max_workers == 0:
+        partials = [aggregate_file(p, f, chunk_rows) for p, f in zip(paths, file_fields)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            partials = list(pool.map(aggregate_file, paths, file_fields, [chunk_rows] * len(paths)))
+
+    counties, districts = combine(partials, district_fields)
+    rows = sum(p["rows"] for p in partials)
+    print(f"Aggregated {rows:,} voters from {len(paths)} files in {time.perf_counter() - start:.2f}s")
+
+    county_df = county_frame(counties)
+    artifacts = [Artifact("county", "county.xlsx", county_df, {
+        "total_counties": int(len(county_df)),
+        "rows_in_source": rows,
+        "source_date": "Full Voter Export",
+    })]
+    for chamber, counts in districts.items():
+        df = district_frame(counts)
+        unassigned = int(counts[0].sum())
+        if unassigned:
+            print(f"{chamber}: {unassigned:,} voters have no usable district code")
+        artifacts.append(Artifact(chamber, f"{chamber}.xlsx", df, {
+            "districts": int(len(df)),
+            "rows_in_source": rows,
+            "unassigned": unassigned,
+        }))
+    return artifacts
+
+def parse_district_fields(specs):
+    fields = dict(DISTRICT_FIELDS)
+    for spec in specs or []:
+        chamber, _, field = spec.partition("=")
+        fields[chamber.strip()] = int(field)
+    return fields
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate Full Voter Export files into party breakdowns.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--output", default="data/voter_export")
+    parser.add_argument("--workers", type=int, default=None, help="0 runs in a single process")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--district-field", action="append", metavar="CHAMBER=FIELD",
+                        help="0-based column holding a chamber's district code, for counties without an election map")
+    args = parser.parse_args()
+    artifacts = aggregate(args.files, parse_district_fields(args.district_field), args.workers, args.chunk_rows)
+    write_artifacts(artifacts, args.output)
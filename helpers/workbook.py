@@ -0,0 +1,110 @@
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+XLS_MAGIC = b"\xd0\xcf\x11\xe0"
+
+class WorkbookTable(NamedTuple):
+    frame: pd.DataFrame
+    preamble: list
+    rows_read: int
+    rows_kept: int
+    seconds: float
+
+def is_legacy_xls(file_path):
+    with open(file_path, "rb") as f:
+        return f.read(4) == XLS_MAGIC
+
+def iter_rows(file_path):
+    # DOS names some .xlsx downloads .xls, so sniff the container rather than trusting the suffix.
+    if is_legacy_xls(file_path):
+        import xlrd
+        book = xlrd.open_workbook(str(file_path), on_demand=True)
+        try:
+            sheet = book.sheet_by_index(0)
+            for i in range(sheet.nrows):
+                yield tuple(None if v == "" else v for v in sheet.row_values(i))
+        finally:
+            book.release_resources()
+        return
+
+    import openpyxl
+    # openpyxl rejects unfamiliar suffixes by name, but not when handed a file object.
+    with open(file_path, "rb") as f:
+        wb = openpyxl.load_workbook(f, read_only=True, data_only=True)
+        try:
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+def read_table(file_path, header_row=0, fill_down=(), keep=None):
+    start = time.perf_counter()
+    preamble = []
+    columns = None
+    names = []
+    fill_idx = []
+    keep_idx = None
+    last_seen = {}
+    records = []
+    rows_read = 0
+
+    for i, row in enumerate(iter_rows(file_path)):
+        if i < header_row:
+            preamble.append(row)
+            continue
+        if i == header_row:
+            columns = [j for j, name in enumerate(row) if name is not None and str(name).strip()]
+            names = [row[j] for j in columns]
+            fill_idx = [k for k, name in enumerate(names) if name in fill_down]
+            keep_idx = names.index(keep[0]) if keep is not None else None
+            continue
+        if all(v is None for v in row):
+            continue
+
+        rows_read += 1
+        values = [row[j] if j < len(row) else None for j in columns]
+        for k in fill_idx:
+            if values[k] is None:
+                values[k] = last_seen.get(k)
+            else:
+                last_seen[k] = values[k]
+        if keep_idx is not None and not keep[1](values[keep_idx]):
+            continue
+        records.append(values)
+
+    frame = pd.DataFrame(records, columns=names)
+    seconds = time.perf_counter() - start
+    print(f"Parsed {Path(file_path).name}: kept {len(records)} of {rows_read} rows in {seconds:.3f}s")
+    return WorkbookTable(frame, preamble, rows_read, len(records), seconds)
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        fn()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+def compare(file_path, header_row=0):
+    pandas_s, pandas_peak = measure(lambda: pd.read_excel(file_path, header=header_row))
+    stream_s, stream_peak = measure(lambda: read_table(file_path, header_row=header_row))
+    print(f"pandas.read_excel: {pandas_s:.3f}s, peak {pandas_peak / 1e6:.1f} MB")
+    print(f"streaming reader:  {stream_s:.3f}s, peak {stream_peak / 1e6:.1f} MB")
+    return {
+        "pandas": {"seconds": pandas_s, "peak_bytes": pandas_peak},
+        "streaming": {"seconds": stream_s, "peak_bytes": stream_peak},
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pandas and streaming workbook parsing.")
+    parser.add_argument("file")
+    parser.add_argument("--header-row", type=int, default=0)
+    args = parser.parse_args()
+    compare(args.file, args.header_row)
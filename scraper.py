@@ -1,9 +1,19 @@
-from dotenv import load_dotenv, find_dotenv
-load_dotenv(find_dotenv())
-import requests
+import argparse
+import dataclasses
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date
+from functools import partial
 from pathlib import Path
-from helpers import county, total, congress, house, senate
-from helpers.upload_to_s3 import upload_to_s3
+from helpers.formats import FORMATS, parse_format_specs
+from helpers.instrument import current_stage, start_run, write_report
+
+# Heavy dependencies (pandas, numpy, requests, boto3) are imported inside the
+# functions that need them so `status` and --help start instantly.
 
 FILES_TO_DOWNLOAD = {
     "current_voter_stats.xls": "https://www.pa.gov/content/dam/copapwp-pagov/en/dos/resources/voting-and-elections/voting-and-election-statistics/currentvotestats.xlsx",
@@ -12,35 +22,324 @@ FILES_TO_DOWNLOAD = {
     "house.xlsx": "https://www.pa.gov/content/dam/copapwp-pagov/en/dos/resources/voting-and-elections/voting-and-election-statistics/current%20voterregstatsbylegislativedistricts.xlsx",
 }
 
-def download_files():
-    data_dir = Path("data")
-    raw_dir = data_dir / "raw"
-    processed_dir = data_dir / "processed"
+# geography node: (source file, helper module, extra modules its output depends on)
+GEOGRAPHIES = {
+    "county": ("current_voter_stats.xls", "county", ("schema", "workbook", "artifacts")),
+    "congress": ("congress.xlsx", "congress", ("districts", "geography", "schema", "workbook", "artifacts")),
+    "senate": ("senate.xlsx", "senate", ("districts", "geography", "schema", "workbook", "artifacts")),
+    "house": ("house.xlsx", "house", ("districts", "geography", "schema", "workbook", "artifacts")),
+}
+DATA_DIR = Path("data")
+RAW_DIR = DATA_DIR / "raw"
+PROCESSED_DIR = DATA_DIR / "processed"
+FETCH_CACHE_PATH = RAW_DIR / "fetch_cache.json"
+
+def parse_source(helper_name, path, profile=False):
+    # Runs in a worker process; the artifact is pickled back instead of re-read from disk,
+    # and the profile, memory and CPU numbers are the worker's own.
+    from contextlib import nullcontext
+
+    from helpers.instrument import peak_rss_bytes, profiling
+
+    helper = importlib.import_module(f"helpers.{helper_name}")
+    started = time.process_time()
+    counters = {}
+    with profiling(helper_name, counters) if profile else nullcontext():
+        artifact = helper.process_file(path)
+    counters.update({
+        "bytes_read": Path(path).stat().st_size,
+        "rows_in": artifact.metadata.get("rows_in_source", len(artifact.frame)),
+        "rows_out": int(len(artifact.frame)),
+        "worker_pid": os.getpid(),
+        "worker_cpu_seconds": round(time.process_time() - started, 4),
+        "rss_high_water_bytes": peak_rss_bytes(),
+    })
+    return artifact, counters
+
+def parse_node(pool, helper_name, source):
+    from helpers.instrument import wants_profile
+
+    if pool is None:
+        artifact, counters = parse_source(helper_name, source["path"])
+    else:
+        artifact, counters = pool.submit(parse_source, helper_name, source["path"], wants_profile(helper_name)).result()
+    current_stage().update(counters)
+    return artifact
+
+def run_helper(helper, source):
+    artifact = helper.process_file(source)
+    record = current_stage()
+    record["rows_in"] = int(len(source.frame))
+    record["rows_out"] = int(len(artifact.frame))
+    return artifact
+
+def helper_modules(*names):
+    return tuple(importlib.import_module(f"helpers.{name}") for name in names)
+
+def make_parse_pool(parse_workers):
+    from concurrent.futures import ProcessPoolExecutor
+
+    if parse_workers == 0:
+        return None
+    pool = ProcessPoolExecutor(max_workers=parse_workers or min(len(GEOGRAPHIES), os.cpu_count() or 1))
+    # Start the workers now, before the fetch threads exist, so forking never copies a held lock.
+    pool.submit(os.getpid).result()
+    return pool
+
+def fetch_source(session, cache, lock, force, url, path):
+    from helpers.fetch import fetch
+
+    with lock:
+        entry = cache.get(url)
+    fetched = fetch(session, url, path, entry, force)
+    with lock:
+        cache[url] = fetched["entry"]
+    record = current_stage()
+    record["bytes_read"] = fetched["bytes"]
+    record["not_modified"] = fetched["not_modified"]
+    if fetched["not_modified"]:
+        print(f"Not modified: {fetched['path']}")
+    else:
+        print(f"Downloaded: {fetched['path']} ({fetched['bytes']} bytes, sha256 {fetched['sha256'][:12]})")
+    # Only the path and digest go downstream, so an unchanged file memoizes its consumers.
+    return {"path": str(fetched["path"]), "sha256": fetched["sha256"]}
+
+def snapshot_date(artifact_list, processed_dir=PROCESSED_DIR):
+    from helpers.artifacts import load_metadata
+    from helpers.rollups import parse_source_date
+
+    for artifact in artifact_list:
+        if artifact.name == "county":
+            return parse_source_date(artifact.metadata.get("source_date")) or date.today()
+    return parse_source_date(load_metadata(processed_dir).get("last_updated")) or date.today()
+
+def compute_rollups(*artifact_list):
+    from helpers.rollups import update_rollups
+
+    return update_rollups(artifact_list, snapshot_date(artifact_list))
+
+def write_outputs(processed_dir, formats, *inputs):
+    from helpers.artifacts import write_artifact_files
+
+    artifact_list = [a for item in inputs for a in (item if isinstance(item, list) else [item])]
+    write_artifact_files(artifact_list, processed_dir, formats)
+    record = current_stage()
+    record["bytes_written"] = sum(
+        (Path(processed_dir) / name).stat().st_size for a in artifact_list for name in a.files.values()
+    )
+    # Downstream only needs names, files and metadata; drop the frames before memoizing.
+    return [dataclasses.replace(a, frame=None, breakdown=None) for a in artifact_list]
+
+def finalize(processed_dir, *written):
+    from helpers.artifacts import write_metadata
+    from helpers.snapshots import snapshot_local
+
+    artifact_list = [a for group in written for a in group]
+    metadata = write_metadata(artifact_list, processed_dir)
+    snapshot_local(processed_dir, date.today().strftime("%Y-%m-%d"))
+    return metadata
+
+def build_views_node(*inputs):
+    from helpers.views import build_views
+
+    return build_views([a for item in inputs for a in (item if isinstance(item, list) else [item])])
+
+def build_crosswalk_node(*chamber_artifacts):
+    from helpers.crosswalk import build_crosswalks
+
+    return [str(p) for p in build_crosswalks(chamber_artifacts)]
 
-    raw_dir.mkdir(parents=True, exist_ok=True)
-    processed_dir.mkdir(parents=True, exist_ok=True)
+def publish(processed_dir=PROCESSED_DIR):
+    from helpers.upload_to_s3 import upload_to_s3
 
+    return upload_to_s3(processed_dir)
+
+def build_pipeline(files, session, cache, force=False, formats=None, processed_dir=PROCESSED_DIR, parse_pool=None,
+                   with_publish=False):
+    from helpers.pipeline import Node, Pipeline
+
+    artifacts, crosswalk, fetch_module, formats_module, rollups, schema, snapshots, total, views = helper_modules(
+        "artifacts", "crosswalk", "fetch", "formats", "rollups", "schema", "snapshots", "total", "views"
+    )
+    lock = threading.Lock()
+    nodes = []
+    for filename, url in files.items():
+        nodes.append(Node(
+            f"fetch:{filename}",
+            partial(fetch_source, session, cache, lock, force, url, RAW_DIR / filename),
+            modules=(fetch_module,),
+            memoize=False,
+        ))
+
+    for name, (filename, helper, extra) in GEOGRAPHIES.items():
+        parse = partial(parse_node, parse_pool, helper)
+        nodes.append(Node(name, parse, (f"fetch:{filename}",), modules=helper_modules(helper, *extra)))
+    nodes.append(Node("total", partial(run_helper, total), ("county",), modules=(total, artifacts)))
+    nodes.append(Node("rollups", compute_rollups, tuple(GEOGRAPHIES), modules=(rollups, artifacts)))
+    nodes.append(Node("views", build_views_node, (*GEOGRAPHIES, "rollups"), modules=(views, schema, artifacts)))
+    nodes.append(Node("crosswalk", build_crosswalk_node, ("congress", "senate", "house"), modules=(crosswalk,)))
+
+    write_fn = partial(write_outputs, processed_dir, formats or {})
+    write_modules = (artifacts, formats_module)
+    nodes.append(Node("write:county", write_fn, ("county", "total"), modules=write_modules, params=formats))
+    for name in ("congress", "senate", "house"):
+        nodes.append(Node(f"write:{name}", write_fn, (name,), modules=write_modules, params=formats))
+    nodes.append(Node("write:changes", write_fn, ("rollups",), modules=write_modules, params=formats))
+    nodes.append(Node("write:views", write_fn, ("views",), modules=write_modules, params=formats))
+    write_nodes = tuple(n.name for n in nodes if n.name.startswith("write:"))
+
+    nodes.append(Node("metadata", partial(finalize, processed_dir), write_nodes, modules=(artifacts, snapshots)))
+    if with_publish:
+        upload = helper_modules("upload_to_s3")
+        nodes.append(Node("publish", lambda _metadata: publish(processed_dir), ("metadata",), modules=upload))
+    return Pipeline(nodes)
+
+def download_files(force=False, formats=None, files=None, only=None, publish=False, max_workers=None,
+                   parse_workers=None, targets=None):
+    from helpers.fetch import load_cache, make_session, save_cache
+
+    files = files or FILES_TO_DOWNLOAD
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+
+    cache = load_cache(FETCH_CACHE_PATH)
+    targets = targets or ["metadata", "crosswalk"] + (["publish"] if publish else [])
+    parse_pool = None
+    try:
+        with make_session(len(files)) as session:
+            pipeline = build_pipeline(files, session, cache, force, formats, with_publish=publish)
+            selected, frozen = pipeline.plan(targets, only)
+            # Only fork parse workers when this run parses something (not for `fetch`).
+            if any(name in GEOGRAPHIES for name in selected - frozen):
+                parse_pool = make_parse_pool(parse_workers)
+                pipeline = build_pipeline(files, session, cache, force, formats, parse_pool=parse_pool,
+                                          with_publish=publish)
+            results = pipeline.run(targets, only=only, force=force, max_workers=max_workers or len(files) + 2)
+    finally:
+        save_cache(FETCH_CACHE_PATH, cache)
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+    return [name for name, result in results.items() if result.ran and not name.startswith("fetch:")]
+
+def read_json(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+def show_status():
+    metadata = read_json(PROCESSED_DIR / "metadata.json")
+    print(f"Last updated: {metadata.get('last_updated', 'never')} (generated {metadata.get('generated_at_utc', '-')})")
+
+    cache = read_json(FETCH_CACHE_PATH)
     for filename, url in FILES_TO_DOWNLOAD.items():
-        resp = requests.get(url)
-        resp.raise_for_status()
-        raw_path = raw_dir / filename
-        raw_path.write_bytes(resp.content)
-        print(f"Downloaded: {raw_path}")
-
-        if filename == "current_voter_stats.xls":
-            processed_path = county.process_file(raw_path, processed_dir)
-            total.process_file(processed_path, processed_dir)
-        elif filename == "congress.xlsx":
-            congress.process_file(raw_path, processed_dir)
-        elif filename == "house.xlsx":
-            house.process_file(raw_path, processed_dir)
-        elif filename == "senate.xlsx":
-            senate.process_file(raw_path, processed_dir)
-
-    return list(data_dir.rglob("*"))
+        entry = cache.get(url, {})
+        validator = entry.get("etag") or entry.get("last_modified") or "-"
+        print(f"  fetch  {filename:<24} sha256 {entry.get('sha256', '-')[:12]:<12}  {validator}")
+
+    from helpers.pipeline import CACHE_DIR
+
+    index = read_json(CACHE_DIR / "index.json")
+    for name, entry in sorted(index.items()):
+        if not name.startswith("fetch:"):
+            print(f"  node   {name:<24} {entry.get('digest', '-')[:12]:<12}  {entry.get('updated_at_utc', '-')}")
+
+    report = read_json(PROCESSED_DIR / "run_report.json")
+    if report:
+        print(f"Last run: {report.get('started_at_utc')} ({report.get('wall_seconds')}s)")
+
+def add_pipeline_arguments(parser):
+    parser.add_argument("--force", action="store_true", help="ignore the fetch cache and memoized stages and rerun everything")
+    parser.add_argument(
+        "--format", dest="formats", action="append", metavar="ARTIFACT=FMT[,FMT]",
+        help=f"output formats per artifact (or 'all'); choices: {', '.join(FORMATS)}",
+    )
+    parser.add_argument(
+        "--profile", action="append", metavar="STAGE",
+        help="capture cProfile and tracemalloc data for a stage (e.g. house, fetch, all)",
+    )
+    parser.add_argument("--only", action="append", metavar="NODE",
+                        help="run just this pipeline node, what it needs and what consumes it (e.g. house)")
+    parser.add_argument("--workers", type=int, default=None, help="maximum stages running at once")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="processes for workbook parsing; 0 parses in this process (for debugging)")
+
+COMMANDS = ("run", "fetch", "process", "publish", "archive-sync", "status")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Fetch, process and publish PA voter registration data.")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    for name, help_text in (
+        ("run", "fetch, process and publish (the default)"),
+        ("fetch", "download changed source workbooks only"),
+        ("process", "fetch and rebuild data/processed without publishing"),
+    ):
+        add_pipeline_arguments(commands.add_parser(name, help=help_text))
+    commands.add_parser("publish", help="upload data/processed to S3")
+    archive_parser = commands.add_parser("archive-sync", help="sync historical registration PDFs")
+    archive_parser.add_argument("--workers", type=int, default=None)
+    archive_parser.add_argument("--revalidate", action="store_true",
+                                help="send conditional requests for files already in the manifest")
+    archive_parser.add_argument("--extract", action="store_true",
+                                help="parse synced PDFs into the historical Parquet dataset")
+    archive_parser.add_argument("--force", action="store_true", help="refetch and reparse the statistics page")
+    archive_parser.add_argument("--page", help="read archive links from a saved copy of the statistics page")
+    commands.add_parser("status", help="show cached fetch, pipeline and run state without touching the network")
+    return parser
+
+def run_pipeline(args):
+    targets = [f"fetch:{name}" for name in FILES_TO_DOWNLOAD] if args.command == "fetch" else None
+    ran = download_files(
+        force=args.force,
+        formats=parse_format_specs(args.formats),
+        only=args.only,
+        publish=args.command == "run",
+        # Profiled stages share one process-wide tracemalloc, so profile one stage at a time.
+        max_workers=1 if args.profile else args.workers,
+        parse_workers=args.parse_workers,
+        targets=targets,
+    )
+    if args.command != "fetch" and not ran:
+        print("Source workbooks unchanged; nothing to do.")
+
+def archive_sync(args):
+    import archive
+
+    archive.download_archive_pdfs(
+        max_workers=args.workers or archive.MAX_WORKERS,
+        revalidate=args.revalidate,
+        force=args.force,
+        page_path=args.page,
+    )
+    if args.extract:
+        from helpers.historical import build_dataset
+
+        build_dataset()
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = ["run", *argv]
+    args = parser.parse_args(argv)
+    if args.command == "status":
+        show_status()
+        return
+
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(find_dotenv())
+    start_run(profile=getattr(args, "profile", None))
+    try:
+        if args.command == "publish":
+            publish()
+        elif args.command == "archive-sync":
+            archive_sync(args)
+        else:
+            run_pipeline(args)
+    finally:
+        write_report(PROCESSED_DIR)
 
 if __name__ == "__main__":
-    download_files()
-    urls = upload_to_s3()
-    if not urls:
-        print("No files uploaded.")
\ No newline at end of file
+    main()
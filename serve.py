@@ -0,0 +1,235 @@
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+PROCESSED_DIR = Path("data/processed")
+# endpoint: (artifact stem, key column, query parameter that filters on the key)
+DATASETS = {
+    "county": ("county", "CountyName", "county"),
+    "total": ("total", "Party", "party"),
+    "congress": ("congress", "DistrictCode", "district"),
+    "house": ("house", "DistrictCode", "district"),
+    "senate": ("senate", "DistrictCode", "district"),
+    "view_county": ("view_county", "CountyName", "county"),
+    "view_congress": ("view_congress", "DistrictCode", "district"),
+    "view_house": ("view_house", "DistrictCode", "district"),
+    "view_senate": ("view_senate", "DistrictCode", "district"),
+}
+RELOAD_CHECK_SECONDS = 1.0
+MAX_CACHED_RESPONSES = 1024
+MIN_GZIP_BYTES = 512
+
+class Dataset:
+    # Column arrays plus a key -> row index, so filtered queries never scan a DataFrame.
+    def __init__(self, frame, key, param):
+        self.columns = list(frame.columns)
+        self.arrays = {col: frame[col].to_numpy() for col in self.columns}
+        self.key = key
+        self.param = param
+        self.index = {}
+        for i, value in enumerate(self.arrays[key]):
+            self.index.setdefault(normalize_key(value), []).append(i)
+
+    def select(self, keys=None, parties=None):
+        if keys:
+            rows = [i for k in keys for i in self.index.get(normalize_key(k), [])]
+        else:
+            rows = slice(None)
+        columns = self.columns
+        if parties:
+            wanted = {normalize_key(p) for p in parties}
+            # A party's columns all start with its name: "Democrat Share Rank", "Democrat Share Change 30d", ...
+            columns = [c for c in self.columns if c == self.key or party_of(c, wanted)]
+        data = {c: self.arrays[c][rows] for c in columns}
+        return [
+            {c: to_json_value(data[c][i]) for c in columns}
+            for i in range(len(data[self.key]))
+        ]
+
+def party_of(column, parties):
+    column = normalize_key(column)
+    return any(column == p or column.startswith(p + " ") for p in parties)
+
+def normalize_key(value):
+    value = str(value).strip().lower()
+    return str(int(value)) if value.isdigit() else value
+
+def split_values(values):
+    return tuple(sorted({normalize_key(v) for value in values for v in value.split(",") if v.strip()}))
+
+def to_json_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    # Views hold NaN for "no earlier snapshot"; JSON has no NaN, so send null.
+    if value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+def read_artifact(processed_dir, stem):
+    for suffix, reader in ((".parquet", pd.read_parquet), (".json", lambda p: pd.read_json(p, orient="records")), (".xlsx", pd.read_excel)):
+        path = processed_dir / f"{stem}{suffix}"
+        if path.exists():
+            return reader(path)
+    return None
+
+class DataStore:
+    def __init__(self, processed_dir=PROCESSED_DIR):
+        self.processed_dir = Path(processed_dir)
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+        self.version = None
+        self.metadata = {}
+        self.datasets = {}
+        self.responses = {}
+        self.checked_at = 0.0
+        self.metadata_mtime = None
+        self.reload()
+
+    def reload(self):
+        metadata_path = self.processed_dir / "metadata.json"
+        metadata = json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+        datasets = {}
+        for name, (stem, key, param) in DATASETS.items():
+            frame = read_artifact(self.processed_dir, stem)
+            if frame is not None and key in frame.columns:
+                datasets[name] = Dataset(frame, key, param)
+        with self.lock:
+            self.metadata = metadata
+            self.datasets = datasets
+            self.version = metadata.get("generated_at_utc")
+            self.responses = {}
+            self.metadata_mtime = metadata_path.stat().st_mtime if metadata_path.exists() else None
+        print(f"Loaded {sorted(datasets)} (generated {self.version})")
+
+    def maybe_reload(self):
+        if time.monotonic() - self.checked_at < RELOAD_CHECK_SECONDS:
+            return
+        # One thread checks (and reloads) at a time; the others keep serving the current data.
+        if not self.reload_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            if now - self.checked_at < RELOAD_CHECK_SECONDS:
+                return
+            self.checked_at = now
+            metadata_path = self.processed_dir / "metadata.json"
+            mtime = metadata_path.stat().st_mtime if metadata_path.exists() else None
+            if mtime == self.metadata_mtime:
+                return
+            try:
+                generated = json.loads(metadata_path.read_text()).get("generated_at_utc")
+            except Exception:
+                return
+            if generated != self.version:
+                self.reload()
+            else:
+                self.metadata_mtime = mtime
+        finally:
+            self.reload_lock.release()
+
+    def request_key(self, datasets, path, query):
+        # Normalized (dataset, keys, parties), so unknown params and key order/case share one entry.
+        parts = [p for p in path.split("/") if p]
+        if parts == ["metadata"]:
+            return ("metadata",)
+        if len(parts) != 2 or parts[0] != "api" or parts[1] not in datasets:
+            return None
+        dataset = datasets[parts[1]]
+        keys = split_values(query.get(dataset.param, []))
+        parties = () if dataset.param == "party" else split_values(query.get("party", []))
+        return (parts[1], keys, parties)
+
+    def response(self, path, query):
+        # Build from one consistent snapshot, so a reload mid-request can't cache old data.
+        with self.lock:
+            version, metadata, datasets, responses = self.version, self.metadata, self.datasets, self.responses
+        cache_key = self.request_key(datasets, path, query)
+        if cache_key is None:
+            return None
+        cached = responses.get(cache_key)
+        if cached is not None:
+            return cached
+
+        payload = metadata if cache_key == ("metadata",) else self.build(datasets, cache_key)
+        if payload is None:
+            return None
+        body = json.dumps(payload, separators=(",", ":"), allow_nan=False).encode()
+        entry = {
+            "body": body,
+            "gzip": gzip.compress(body, mtime=0) if len(body) >= MIN_GZIP_BYTES else None,
+            "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+        }
+        with self.lock:
+            if self.version == version and self.responses is responses:
+                if len(responses) >= MAX_CACHED_RESPONSES:
+                    responses.pop(next(iter(responses)))
+                responses[cache_key] = entry
+        return entry
+
+    def build(self, datasets, cache_key):
+        name, keys, parties = cache_key
+        dataset = datasets.get(name)
+        return dataset.select(keys=keys, parties=parties) if dataset else None
+
+class Handler(BaseHTTPRequestHandler):
+    store = None
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.store.maybe_reload()
+        url = urlparse(self.path)
+        entry = self.store.response(url.path, parse_qs(url.query))
+        if entry is None:
+            return self.send_body(HTTPStatus.NOT_FOUND, b'{"error":"not found"}')
+
+        if self.headers.get("If-None-Match") == entry["etag"]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", entry["etag"])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        use_gzip = entry["gzip"] is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        self.send_body(HTTPStatus.OK, entry["gzip"] if use_gzip else entry["body"], entry["etag"], use_gzip)
+
+    def send_body(self, status, body, etag=None, gzipped=False):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+def make_server(host="127.0.0.1", port=8000, processed_dir=PROCESSED_DIR):
+    handler = type("BoundHandler", (Handler,), {"store": DataStore(processed_dir)})
+    return ThreadingHTTPServer((host, port), handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve processed voter registration data as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", default=str(PROCESSED_DIR))
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.data)
+    print(f"Serving {args.data} on http://{args.host}:{args.port}")
+    server.serve_forever()